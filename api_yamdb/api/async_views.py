@@ -0,0 +1,183 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from threading import Event
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers import asgi
+from django.db import close_old_connections
+from rest_framework.routers import DefaultRouter
+
+from api_yamdb.db import check_connections
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+ASYNC_READ_ROUTES = (
+    'titles-list', 'titles-detail',
+    'reviews-list', 'reviews-detail',
+    'comments-list', 'comments-detail',
+)
+
+# Частей потокового ответа, прочитанных из БД впрок
+STREAM_QUEUE_SIZE = 2
+DONE = object()
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='yamdb-read'
+)
+
+
+def run_view(view, request, *args, **kwargs):
+    """Выполняет sync-view в потоке пула и сразу отрисовывает ответ.
+
+    Соединения с БД живут в потоках пула, поэтому их проверка
+    и закрытие по CONN_MAX_AGE делаются здесь, а не в сигналах запроса.
+    """
+    close_old_connections()
+    check_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+class ThreadedStream:
+    """Асинхронный итератор по частям потокового ответа.
+
+    Sync-итератор целиком читается в одном потоке пула: выборка
+    страницы идёт одним курсором, а ORM недоступен в цикле событий.
+    Очередь из STREAM_QUEUE_SIZE частей не даёт потоку читать БД
+    быстрее, чем клиент принимает ответ.
+    """
+
+    def __init__(self, content):
+        self.content = content
+        self.queue = None
+        self.producer = None
+        self.stopped = Event()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.queue is None:
+            loop = asyncio.get_running_loop()
+            self.queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+            self.producer = loop.run_in_executor(
+                executor, contextvars.copy_context().run, self.produce, loop
+            )
+        chunk, error = await self.queue.get()
+        if error is not None:
+            raise error
+        if chunk is DONE:
+            raise StopAsyncIteration
+        return chunk
+
+    def put(self, loop, item):
+        asyncio.run_coroutine_threadsafe(self.queue.put(item), loop).result()
+        return not self.stopped.is_set()
+
+    def produce(self, loop):
+        try:
+            for chunk in self.content:
+                if not self.put(loop, (chunk, None)):
+                    return
+            self.put(loop, (DONE, None))
+        except Exception as error:
+            self.put(loop, (None, error))
+        finally:
+            close = getattr(self.content, 'close', None)
+            if close is not None:
+                close()
+            close_old_connections()
+
+    async def aclose(self):
+        """Останавливает чтение и ждёт, пока поток закроет соединения."""
+        self.stopped.set()
+        if self.producer is None:
+            return
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        await self.producer
+
+
+class ASGIHandler(asgi.ASGIHandler):
+    """ASGIHandler, отдающий потоковые ответы без блокировки цикла событий.
+
+    Django 3.2 перебирает streaming_content прямо в цикле событий,
+    поэтому запросы к БД внутри потока падали бы с
+    SynchronousOnlyOperation. Здесь части читает ThreadedStream.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            await super().send_response(response, send)
+            return
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.get_headers(response),
+        })
+        stream = ThreadedStream(iter(response))
+        try:
+            async for part in stream:
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+        finally:
+            await stream.aclose()
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    def get_headers(self, response):
+        headers = [
+            (
+                header.encode('ascii') if isinstance(header, str) else header,
+                value.encode('latin1') if isinstance(value, str) else value,
+            )
+            for header, value in response.items()
+        ]
+        headers += [
+            (b'Set-Cookie', cookie.output(header='').encode('ascii').strip())
+            for cookie in response.cookies.values()
+        ]
+        return headers
+
+
+def async_read_view(view):
+    """Async-обёртка над view DRF: чтения идут в ограниченный пул потоков.
+
+    Django 3.2 не умеет асинхронно работать с ORM, а sync-view под ASGI
+    выполняются по очереди в одном потоке. Чтения выполняются параллельно
+    в пуле из ASYNC_DB_THREADS потоков — это же ограничивает число
+    соединений с БД на воркер. Запись остаётся в общем sync-потоке.
+    """
+    read = sync_to_async(run_view, thread_sensitive=False, executor=executor)
+    write = sync_to_async(run_view)
+
+    @wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method in READ_METHODS:
+            return await read(view, request, *args, **kwargs)
+        return await write(view, request, *args, **kwargs)
+
+    return async_view
+
+
+class AsyncReadRouter(DefaultRouter):
+    """Роутер, подменяющий view чтения на async при ASYNC_READ_VIEWS."""
+
+    def get_urls(self):
+        urls = super().get_urls()
+        if settings.ASYNC_READ_VIEWS:
+            for pattern in urls:
+                if pattern.name in ASYNC_READ_ROUTES:
+                    pattern.callback = async_read_view(pattern.callback)
+        return urls
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import CLAIMS_CACHE_KEY, User
+
+CLAIMS = ('username', 'role', 'is_superuser', 'claims_version')
+# Кеши процесса не видят отзыв прав в других воркерах
+LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class ClaimsAccessToken(AccessToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+def get_claims_state(user_id):
+    """(claims_version, is_active) пользователя или None, если его нет.
+
+    Читается из БД по первичному ключу; с общим кешем (не LocMem)
+    значение хранится JWT_CLAIMS_CACHE_TIMEOUT секунд и сбрасывается
+    при смене прав.
+    """
+    timeout = settings.JWT_CLAIMS_CACHE_TIMEOUT
+    shared = timeout and not isinstance(caches['default'], LOCAL_CACHES)
+    key = CLAIMS_CACHE_KEY.format(user_id=user_id)
+    if shared:
+        state = cache.get(key)
+        if state is not None:
+            return tuple(state)
+    state = User.objects.filter(pk=user_id).values_list(
+        'claims_version', 'is_active'
+    ).first()
+    if shared and state is not None:
+        cache.add(key, state, timeout)
+    return state
+
+
+def load_user(user):
+    deferred = user.get_deferred_fields()
+    if deferred:
+        user.refresh_from_db(fields=deferred)
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Строит пользователя из ролей в токене без чтения всей строки.
+
+    Из БД (или общего кеша) читаются только claims_version и is_active,
+    остальные поля отложены до обращения к ним. Токены, выданные до
+    смены роли или блокировки, и токены удалённых пользователей
+    проходят обычную проверку по БД.
+    """
+
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in CLAIMS):
+            return super().get_user(validated_token)
+        state = get_claims_state(validated_token['user_id'])
+        if state != (validated_token['claims_version'], True):
+            return super().get_user(validated_token)
+        values = {
+            'id': validated_token['user_id'],
+            'is_active': True,
+            **{claim: validated_token[claim] for claim in CLAIMS},
+        }
+        fields = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in values
+        ]
+        return User.from_db(
+            router.db_for_read(User), fields,
+            [values[field] for field in fields]
+        )
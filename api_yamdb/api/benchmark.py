@@ -0,0 +1,337 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from reviews.management.commands.load_data import reset_sequences
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, TitleScore)
+from users.models import User
+
+from .authentication import ClaimsAccessToken
+from .cache import bump_generation
+from .fast import (FastCommentSerializer, FastReviewSerializer,
+                   FastTitleSerializer)
+from .renderers import FastJSONRenderer
+from .serializers import (CommentsSerializer, ReviewSerializer,
+                          TitleGetSerializer)
+
+SCENARIOS = (
+    'title_list', 'title_detail', 'review_list', 'comment_list',
+    'signup', 'token', 'review_create',
+)
+PERCENTILES = (50, 95, 99)
+SERIALIZERS = {
+    'titles': (Title.objects.with_related, TitleGetSerializer,
+               FastTitleSerializer),
+    'reviews': (Review.objects.select_related, ReviewSerializer,
+                FastReviewSerializer),
+    'comments': (Comment.objects.select_related, CommentsSerializer,
+                 FastCommentSerializer),
+}
+# Кешируемые сценарии: перед каждым запросом кеш группы сбрасывается,
+# чтобы измерялась работа вьюсета, а не чтение готового ответа.
+CACHE_GROUPS = {'title_list': 'titles', 'title_detail': 'titles'}
+BATCH_SIZE = 1000
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def generate_dataset(titles=100, genres=10, categories=5, users=50,
+                     reviews=5, comments=2):
+    """Создаёт синтетические данные и возвращает число строк по таблицам.
+
+    На каждое произведение приходится ``reviews`` отзывов разных
+    авторов, на каждый отзыв — ``comments`` комментариев.
+    """
+    started = time.monotonic()
+    rows = {}
+
+    def create(model, objects):
+        created = model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+        rows[model.__name__] = rows.get(model.__name__, 0) + len(created)
+        return created
+
+    start = next_id(User)
+    authors = create(User, [
+        User(id=start + number, username=f'bench{start + number}',
+             email=f'bench{start + number}@yamdb.fake')
+        for number in range(users)
+    ])
+    start = next_id(Category)
+    category_list = create(Category, [
+        Category(id=start + number, name=f'Категория {start + number}',
+                 slug=f'bench-category-{start + number}')
+        for number in range(categories)
+    ])
+    start = next_id(Genre)
+    genre_list = create(Genre, [
+        Genre(id=start + number, name=f'Жанр {start + number}',
+              slug=f'bench-genre-{start + number}')
+        for number in range(genres)
+    ])
+    start = next_id(Title)
+    title_list = create(Title, [
+        Title(id=start + number, name=f'Произведение {start + number}',
+              year=2000 + number % 20, description='Описание',
+              category=category_list[number % categories])
+        for number in range(titles)
+    ])
+    create(GenreTitle, [
+        GenreTitle(title=title, genre=genre_list[number % genres])
+        for number, title in enumerate(title_list)
+    ])
+    review_ids = count(next_id(Review))
+    review_list = create(Review, [
+        Review(id=next(review_ids), title=title, text='Отзыв',
+               author=authors[(number + shift) % users],
+               score=1 + (number + shift) % 10)
+        for number, title in enumerate(title_list)
+        for shift in range(min(reviews, users))
+    ])
+    create(Comment, [
+        Comment(review=review, text='Комментарий',
+                author=authors[(number + shift) % users])
+        for number, review in enumerate(review_list)
+        for shift in range(comments)
+    ])
+    reset_sequences([User, Category, Genre, Title, Review, Comment])
+    title_ids = [title.pk for title in title_list]
+    Title.objects.filter(pk__in=title_ids).rebuild_rating()
+    TitleScore.objects.rebuild(title_ids)
+    rows['elapsed'] = time.monotonic() - started
+    return rows
+
+
+class DjangoTarget:
+    """Запросы через тестовый клиент Django с подсчётом SQL-запросов."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, data=None, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(
+                path, data, content_type='application/json', **headers
+            ) if data is not None else getattr(self.client, method)(
+                path, **headers
+            )
+        return response.status_code, len(queries)
+
+
+class HTTPTarget:
+    """Запросы к запущенному серверу, число SQL-запросов неизвестно."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, data=None, token=None):
+        request = urllib.request.Request(
+            self.base_url + path, method=method.upper(),
+            data=None if data is None else json.dumps(data).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        if token:
+            request.add_header('Authorization', f'Bearer {token}')
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as error:
+            return error.code, None
+
+
+def prepare_context(requests):
+    title = Title.objects.filter(reviews__comments__isnull=False).first()
+    if title is None:
+        raise ValueError('Нет данных: запустите бенчмарк с --generate')
+    review = title.reviews.filter(comments__isnull=False).first()
+    start = next_id(User)
+    writers = User.objects.bulk_create(
+        User(id=start + number, username=f'writer{start + number}',
+             email=f'writer{start + number}@yamdb.fake')
+        for number in range(requests)
+    )
+    reset_sequences([User])
+    target_title = Title.objects.create(name='Бенчмарк', year=2000)
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    return {
+        'title': title,
+        'review': review,
+        'target_title': target_title,
+        'writers': [
+            (writer, str(ClaimsAccessToken.for_user(writer)))
+            for writer in writers
+        ],
+        'stamp': start,
+        'pages': -(-Title.objects.count() // page_size),
+    }
+
+
+def get_request(scenario, number, context):
+    title, review = context['title'], context['review']
+    writer, token = context['writers'][number]
+    if scenario == 'title_list':
+        return 'get', (
+            f'/api/v1/titles/?page={number % context["pages"] + 1}'
+        ), None, None
+    if scenario == 'title_detail':
+        return 'get', f'/api/v1/titles/{title.pk}/', None, None
+    if scenario == 'review_list':
+        return 'get', f'/api/v1/titles/{title.pk}/reviews/', None, None
+    if scenario == 'comment_list':
+        return 'get', (
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        ), None, None
+    if scenario == 'signup':
+        name = f'signup{context["stamp"]}_{number}'
+        return 'post', '/api/v1/auth/signup/', {
+            'username': name, 'email': f'{name}@yamdb.fake'
+        }, None
+    if scenario == 'token':
+        return 'post', '/api/v1/auth/token/', {
+            'username': writer.username,
+            'confirmation_code': default_token_generator.make_token(writer),
+        }, None
+    return 'post', (
+        f'/api/v1/titles/{context["target_title"].pk}/reviews/'
+    ), {'text': 'Отзыв', 'score': 5}, token
+
+
+def percentile(values, percent):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+def timed_request(target, scenario, number, context):
+    method, path, data, token = get_request(scenario, number, context)
+    if scenario in CACHE_GROUPS:
+        bump_generation(CACHE_GROUPS[scenario])
+    started = time.perf_counter()
+    status, query_count = target.request(method, path, data, token)
+    latency = (time.perf_counter() - started) * 1000
+    if status >= 400:
+        raise ValueError(f'{scenario}: {method.upper()} {path} -> {status}')
+    return latency, query_count
+
+
+def run_scenario(target, scenario, requests, context, concurrency=1):
+    """Выполняет сценарий; при concurrency > 1 запросы идут параллельно."""
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            measurements = list(pool.map(
+                lambda number: timed_request(
+                    target, scenario, number, context
+                ),
+                range(requests)
+            ))
+    else:
+        measurements = [
+            timed_request(target, scenario, number, context)
+            for number in range(requests)
+        ]
+    elapsed = time.perf_counter() - started
+    latencies = [latency for latency, _ in measurements]
+    queries = [count for _, count in measurements if count is not None]
+    result = {
+        f'p{percent}_ms': round(percentile(latencies, percent), 3)
+        for percent in PERCENTILES
+    }
+    result['requests_per_sec'] = round(requests / elapsed, 1)
+    if queries:
+        result['queries_per_request'] = max(queries)
+    return result
+
+
+def run(target, scenarios=SCENARIOS, requests=50, concurrency=1):
+    context = prepare_context(requests)
+    return {
+        scenario: run_scenario(
+            target, scenario, requests, context, concurrency
+        )
+        for scenario in scenarios
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Возвращает список регрессий относительно сохранённого baseline."""
+    regressions = []
+    for scenario, result in results.items():
+        expected = baseline.get(scenario)
+        if expected is None:
+            continue
+        if result.get('queries_per_request', 0) > expected.get(
+            'queries_per_request', float('inf')
+        ):
+            regressions.append(
+                f'{scenario}: queries {expected["queries_per_request"]} '
+                f'-> {result["queries_per_request"]}'
+            )
+        if result['p95_ms'] > expected.get(
+            'p95_ms', float('inf')
+        ) * (1 + tolerance):
+            regressions.append(
+                f'{scenario}: p95 {expected["p95_ms"]}ms '
+                f'-> {result["p95_ms"]}ms'
+            )
+    return regressions
+
+
+def render_drf(queryset, serializer_class):
+    return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+
+def render_fast(queryset, serializer_class):
+    serializer = serializer_class()
+    return FastJSONRenderer().render(
+        serializer.many(serializer.values(queryset))
+    )
+
+
+def compare_serializers(rows=1000, repeat=5):
+    """Сравнивает сериализаторы DRF и api.fast на первых ``rows`` строках.
+
+    Время включает выборку из БД и рендеринг JSON и приводится
+    в миллисекундах на 1000 строк, лучшее из ``repeat`` прогонов.
+    """
+    results = {}
+    for name, (manager, slow, fast) in SERIALIZERS.items():
+        queryset = manager().order_by('pk')[:rows]
+        total = queryset.count()
+        if not total:
+            continue
+        timings = {}
+        outputs = {}
+        for key, render, serializer_class in (
+            ('drf_ms', render_drf, slow), ('fast_ms', render_fast, fast),
+        ):
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                outputs[key] = render(queryset.all(), serializer_class)
+                best = min(best, time.perf_counter() - started)
+            timings[key] = round(best * 1000 * 1000 / total, 3)
+        results[name] = {
+            'rows': total,
+            **timings,
+            'speedup': round(timings['drf_ms'] / timings['fast_ms'], 2),
+            'identical': outputs['drf_ms'] == outputs['fast_ms'],
+        }
+    return results
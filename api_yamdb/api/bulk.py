@@ -0,0 +1,304 @@
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.response import Response
+from reviews.models import Category, Genre, GenreTitle, Title
+from reviews.validators import validate_year
+
+from .cache import invalidate
+from .permissions import IsAdmin
+from .signals import CACHE_GROUPS
+
+NOT_FOUND = 'Не найдено.'
+DUPLICATE = 'Объект с таким {field} уже есть.'
+DOES_NOT_EXIST = serializers.SlugRelatedField.default_error_messages[
+    'does_not_exist'
+]
+
+
+class NDJSONParser(BaseParser):
+    """Разбирает тело из JSON-объектов, по одному на строку."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        items = []
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError as error:
+                raise ParseError(f'Строка {number}: {error}')
+        return items
+
+
+class BulkSlugSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=settings.LENG_MAX)
+    slug = serializers.SlugField(max_length=settings.LENG_SLUG)
+
+
+class BulkTitleSerializer(serializers.Serializer):
+    """Проверка полей без запросов: slug жанров и категории — строки."""
+    id = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=settings.LENG_MAX)
+    year = serializers.IntegerField(validators=(validate_year,))
+    description = serializers.CharField(required=False, allow_blank=True)
+    category = serializers.SlugField(max_length=settings.LENG_SLUG)
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=settings.LENG_SLUG)
+    )
+
+
+class BulkMixin:
+    """Массовые POST/PATCH/DELETE на <prefix>/bulk/ для администратора.
+
+    Тело — JSON-массив или NDJSON. Ошибки возвращаются по каждому
+    элементу, остальные элементы записываются: один запрос на разрешение
+    ключей каждой модели и bulk_create/bulk_update на запись.
+
+    bulk_create/bulk_update не вызывают save(), post_save и m2m_changed:
+    кеш ответов сбрасывается здесь явно, а подборки TitleRanking
+    обновит только refresh_rankings. Отзывы массово не пишутся, поэтому
+    рейтинг и гистограммы TitleScore эти запросы не затрагивают.
+    """
+    bulk_serializer_class = None
+    bulk_key = None
+
+    @action(
+        detail=False, methods=['post', 'patch', 'delete'], url_path='bulk',
+        permission_classes=(IsAdmin,),
+        parser_classes=(JSONParser, NDJSONParser)
+    )
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({'detail': 'Ожидается список объектов.'})
+        results = [None] * len(items)
+        if request.method == 'DELETE':
+            self.bulk_delete(items, results)
+        else:
+            partial = request.method == 'PATCH'
+            valid = {}
+            for index, item in enumerate(items):
+                serializer = self.bulk_serializer_class(
+                    data=item, partial=partial
+                )
+                if serializer.is_valid():
+                    valid[index] = serializer.validated_data
+                else:
+                    results[index] = self.error(serializer.errors)
+            if partial:
+                self.check_keys(valid, results)
+            with transaction.atomic():
+                if partial:
+                    self.bulk_update(valid, results)
+                else:
+                    self.bulk_create(valid, results)
+        invalidate(*CACHE_GROUPS[self.bulk_model])
+        failed = any(result['status'] >= 400 for result in results)
+        if failed:
+            return Response(results, status=status.HTTP_207_MULTI_STATUS)
+        return Response(results, status=(
+            status.HTTP_201_CREATED if request.method == 'POST'
+            else status.HTTP_200_OK
+        ))
+
+    @property
+    def bulk_model(self):
+        return self.get_queryset().model
+
+    def error(self, errors, code=status.HTTP_400_BAD_REQUEST):
+        return {'status': code, 'errors': errors}
+
+    def check_keys(self, valid, results):
+        for index, data in list(valid.items()):
+            if self.bulk_key not in data:
+                del valid[index]
+                results[index] = self.error(
+                    {self.bulk_key: ['Обязательное поле.']}
+                )
+
+    def bulk_delete(self, items, results):
+        field = self.bulk_serializer_class().fields[self.bulk_key]
+        keys = {}
+        for index, item in enumerate(items):
+            try:
+                keys[index] = field.run_validation(item)
+            except ValidationError as error:
+                results[index] = self.error({self.bulk_key: error.detail})
+        existing = set(self.bulk_model.objects.filter(
+            **{f'{self.bulk_key}__in': keys.values()}
+        ).values_list(self.bulk_key, flat=True))
+        self.bulk_model.objects.filter(
+            **{f'{self.bulk_key}__in': existing}
+        ).delete()
+        for index, key in keys.items():
+            results[index] = (
+                {'status': status.HTTP_204_NO_CONTENT, 'data': key}
+                if key in existing
+                else self.error(NOT_FOUND, status.HTTP_404_NOT_FOUND)
+            )
+
+
+class SlugBulkMixin(BulkMixin):
+    """Массовая запись жанров и категорий, ключ — slug."""
+    bulk_serializer_class = BulkSlugSerializer
+    bulk_key = 'slug'
+
+    def bulk_create(self, valid, results):
+        existing = set(self.bulk_model.objects.filter(
+            slug__in=[data['slug'] for data in valid.values()]
+        ).values_list('slug', flat=True))
+        objects = []
+        for index, data in valid.items():
+            if data['slug'] in existing:
+                results[index] = self.error(
+                    {'slug': [DUPLICATE.format(field='slug')]}
+                )
+                continue
+            existing.add(data['slug'])
+            objects.append(self.bulk_model(**data))
+            results[index] = {'status': status.HTTP_201_CREATED, 'data': data}
+        self.bulk_model.objects.bulk_create(objects)
+
+    def bulk_update(self, valid, results):
+        objects = self.bulk_model.objects.in_bulk(
+            [data['slug'] for data in valid.values()], field_name='slug'
+        )
+        for index, data in valid.items():
+            obj = objects.get(data['slug'])
+            if obj is None:
+                results[index] = self.error(
+                    NOT_FOUND, status.HTTP_404_NOT_FOUND
+                )
+                continue
+            obj.name = data.get('name', obj.name)
+            results[index] = {
+                'status': status.HTTP_200_OK,
+                'data': {'name': obj.name, 'slug': obj.slug},
+            }
+        self.bulk_model.objects.bulk_update(objects.values(), ('name',))
+
+
+class TitleBulkMixin(BulkMixin):
+    """Массовая запись произведений, ключ — id."""
+    bulk_serializer_class = BulkTitleSerializer
+    bulk_key = 'id'
+
+    def resolve(self, valid, results):
+        """Заменяет slug на объекты: по одному запросу на жанры и категории."""
+        items = valid.values()
+        categories = Category.objects.in_bulk(
+            {data['category'] for data in items if 'category' in data},
+            field_name='slug'
+        )
+        genres = Genre.objects.in_bulk(
+            {slug for data in items for slug in data.get('genre', ())},
+            field_name='slug'
+        )
+        for index, data in list(valid.items()):
+            errors = {}
+            if 'category' in data:
+                if data['category'] in categories:
+                    data['category'] = categories[data['category']]
+                else:
+                    errors['category'] = [DOES_NOT_EXIST.format(
+                        slug_name='slug', value=data['category']
+                    )]
+            if 'genre' in data:
+                missing = [
+                    slug for slug in data['genre'] if slug not in genres
+                ]
+                if missing:
+                    errors['genre'] = [
+                        DOES_NOT_EXIST.format(slug_name='slug', value=slug)
+                        for slug in missing
+                    ]
+                else:
+                    data['genre'] = [genres[slug] for slug in data['genre']]
+            if errors:
+                del valid[index]
+                results[index] = self.error(errors)
+
+    def represent(self, title, genres):
+        return {
+            'id': title.pk,
+            'name': title.name,
+            'year': title.year,
+            'description': title.description,
+            'category': getattr(title.category, 'slug', None),
+            'genre': [genre.slug for genre in genres],
+        }
+
+    def link_genres(self, titles):
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, genres in titles
+            for genre in dict.fromkeys(genres)
+        )
+
+    def bulk_create(self, valid, results):
+        self.resolve(valid, results)
+        titles = {}
+        for index, data in valid.items():
+            data.pop('id', None)
+            genres = data.pop('genre')
+            titles[index] = (Title(**data), genres)
+        if connection.features.can_return_rows_from_bulk_insert:
+            Title.objects.bulk_create(title for title, _ in titles.values())
+        else:
+            for title, _ in titles.values():
+                title.save()
+        self.link_genres(titles.values())
+        for index, (title, genres) in titles.items():
+            results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'data': self.represent(title, genres),
+            }
+
+    def bulk_update(self, valid, results):
+        self.resolve(valid, results)
+        titles = Title.objects.select_related('category').in_bulk(
+            [data['id'] for data in valid.values()]
+        )
+        updated = {}
+        fields = set()
+        for index, data in valid.items():
+            title = titles.get(data.pop('id'))
+            if title is None:
+                results[index] = self.error(
+                    NOT_FOUND, status.HTTP_404_NOT_FOUND
+                )
+                continue
+            genres = data.pop('genre', None)
+            for field, value in data.items():
+                setattr(title, field, value)
+            fields.update(data)
+            updated[index] = (title, genres)
+        if fields:
+            Title.objects.bulk_update(
+                [title for title, _ in updated.values()], fields
+            )
+        relinked = [
+            (title, genres) for title, genres in updated.values()
+            if genres is not None
+        ]
+        GenreTitle.objects.filter(
+            title__in=[title for title, _ in relinked]
+        ).delete()
+        self.link_genres(relinked)
+        current = {}
+        for link in GenreTitle.objects.filter(
+            title__in=[title for title, _ in updated.values()]
+        ).select_related('genre'):
+            current.setdefault(link.title_id, []).append(link.genre)
+        for index, (title, _) in updated.items():
+            results[index] = {
+                'status': status.HTTP_200_OK,
+                'data': self.represent(title, current.get(title.pk, [])),
+            }
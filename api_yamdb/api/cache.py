@@ -0,0 +1,88 @@
+import hashlib
+from collections import Counter
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+GENERATION_KEY = 'response-cache:{group}'
+ANONYMOUS = 'anonymous'
+
+stats = Counter()
+stats_lock = Lock()
+
+
+def count(group, outcome):
+    with stats_lock:
+        stats[group, outcome] += 1
+
+
+def get_generation(group):
+    key = GENERATION_KEY.format(group=group)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, 1, timeout=None)
+        return cache.get(key, 1)
+    return generation
+
+
+def bump_generation(group):
+    key = GENERATION_KEY.format(group=group)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def invalidate(*groups):
+    """Сбрасывает закешированные ответы групп сразу и после коммита.
+
+    Повторный сброс после коммита не даёт параллельному запросу
+    закешировать данные, прочитанные до фиксации транзакции.
+    """
+    for group in groups:
+        bump_generation(group)
+        transaction.on_commit(lambda group=group: bump_generation(group))
+
+
+def get_role(user):
+    if not user.is_authenticated:
+        return ANONYMOUS
+    return 'superuser' if user.is_superuser else user.role
+
+
+def get_cache_key(group, request):
+    query = sorted(request.query_params.lists())
+    raw = '|'.join((
+        request.get_host(), request.path, str(query),
+        request.META.get('HTTP_ACCEPT', ''), get_role(request.user),
+    ))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'response:{group}:{get_generation(group)}:{digest}'
+
+
+class CachedListMixin:
+    cache_group = None
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def cached(self, handler, request, *args, **kwargs):
+        key = get_cache_key(self.cache_group, request)
+        data = cache.get(key)
+        if data is not None:
+            count(self.cache_group, 'hit')
+            return Response(data, headers={'X-Cache': 'HIT'})
+        count(self.cache_group, 'miss')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and not response.streaming:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedResponseMixin(CachedListMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
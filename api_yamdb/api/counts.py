@@ -0,0 +1,64 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+
+EXACT = 'exact'
+ESTIMATE = 'estimate'
+
+
+def estimate_count(queryset):
+    """Число строк таблицы по статистике PostgreSQL (pg_class.reltuples).
+
+    None, если БД не PostgreSQL или таблица ещё не анализировалась.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def cached_count(queryset):
+    """Точный COUNT(*) выборки, закешированный на COUNT_CACHE_TIMEOUT.
+
+    Ключ — SQL выборки без сортировки, то есть сам запрос подсчёта.
+    """
+    queryset = queryset.order_by()
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    raw = '|'.join((queryset.db, sql, repr(params)))
+    key = f'count:{hashlib.md5(raw.encode()).hexdigest()}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def get_count(view, queryset, filtered):
+    """Число строк для пагинации по view.count_mode или None для точного.
+
+    estimate берёт статистику таблицы, оценка меньше COUNT_ESTIMATE_MIN
+    заменяется точным подсчётом. Для отфильтрованных списков считается
+    точный COUNT(*), закешированный на COUNT_CACHE_TIMEOUT.
+    """
+    if getattr(view, 'count_mode', EXACT) != ESTIMATE:
+        return None
+    if filtered:
+        return cached_count(queryset)
+    count = estimate_count(queryset)
+    if count is None or count < settings.COUNT_ESTIMATE_MIN:
+        return None
+    return count
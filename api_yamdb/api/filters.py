@@ -1,5 +1,6 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
-from reviews.models import Title
+from reviews.models import Category, Genre, GenreTitle, Title
 
 
 class TitleFilter(filters.FilterSet):
@@ -19,7 +20,40 @@ class TitleFilter(filters.FilterSet):
         field_name='year',
         lookup_expr='icontains'
     )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('name', 'year', 'genre', 'category')
+        fields = ('name', 'year', 'genre', 'category', 'search')
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
+
+
+class TitleExactFilter(TitleFilter):
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    year = filters.NumberFilter(field_name='year')
+    year__gte = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year__lte = filters.NumberFilter(field_name='year', lookup_expr='lte')
+
+    class Meta(TitleFilter.Meta):
+        fields = TitleFilter.Meta.fields + ('year__gte', 'year__lte')
+
+    def filter_category(self, queryset, name, value):
+        category_id = Category.objects.filter(slug=value).values_list(
+            'pk', flat=True
+        ).first()
+        if category_id is None:
+            return queryset.none()
+        return queryset.filter(category_id=category_id)
+
+    def filter_genre(self, queryset, name, value):
+        genre_ids = list(Genre.objects.filter(
+            slug__in=value.split(',')
+        ).values_list('pk', flat=True))
+        if not genre_ids:
+            return queryset.none()
+        return queryset.filter(Exists(GenreTitle.objects.filter(
+            title=OuterRef('pk'), genre_id__in=genre_ids
+        )))
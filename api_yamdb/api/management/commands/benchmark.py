@@ -0,0 +1,164 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from api.benchmark import (SCENARIOS, DjangoTarget, HTTPTarget, compare,
+                           compare_serializers, generate_dataset, run)
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+SERVERS = ('django', 'wsgi', 'asgi')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(mode, workers):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers)],
+        cwd=settings.BASE_DIR, env={**os.environ, 'SERVER_MODE': mode}
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(base_url + '/api/v1/titles/')
+            return process, base_url
+        except urllib.error.HTTPError:
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise CommandError('gunicorn did not start')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark API hot paths and compare them with a saved baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*',
+            help=f'Scenarios to run ({", ".join(SCENARIOS)}), all by default'
+        )
+        parser.add_argument(
+            '--generate', action='store_true',
+            help='Create a synthetic dataset before running'
+        )
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument(
+            '--reviews', type=int, default=10,
+            help='Reviews per title'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=3,
+            help='Comments per review'
+        )
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Requests per scenario'
+        )
+        parser.add_argument(
+            '--server', choices=SERVERS, default='django',
+            help='Django test client or gunicorn in wsgi or asgi mode'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Number of gunicorn workers'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Parallel clients, only for wsgi and asgi servers'
+        )
+        parser.add_argument(
+            '--serializers', action='store_true',
+            help='Compare DRF and fast read serializers instead of scenarios'
+        )
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Rows per serializer comparison'
+        )
+        parser.add_argument('--output', help='Write results as JSON')
+        parser.add_argument(
+            '--baseline', help='Fail on regressions against this JSON file'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Allowed relative p95 latency growth'
+        )
+
+    def generate(self, options):
+        rows = generate_dataset(
+            options['titles'], options['genres'], options['categories'],
+            options['users'], options['reviews'], options['comments']
+        )
+        elapsed = max(rows.pop('elapsed'), 1e-6)
+        total = sum(rows.values())
+        self.stdout.write(
+            f'Generated {total} rows in {elapsed:.2f}s '
+            f'({total / elapsed:.0f} rows/sec)'
+        )
+
+    def get_target(self, options):
+        if options['server'] == 'django':
+            if options['concurrency'] > 1:
+                raise CommandError('--concurrency needs a wsgi or asgi server')
+            return DjangoTarget(), None
+        process, base_url = start_gunicorn(
+            options['server'], options['workers']
+        )
+        return HTTPTarget(base_url), process
+
+    def report(self, results, options):
+        for name, result in results.items():
+            self.stdout.write(f'{name}: ' + ', '.join(
+                f'{key}={value}' for key, value in result.items()
+            ))
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+
+    def handle(self, *args, **options):
+        unknown = set(options['scenarios']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                f'Unknown scenarios: {", ".join(sorted(unknown))}'
+            )
+        if options['generate']:
+            self.generate(options)
+        if options['serializers']:
+            self.report(compare_serializers(options['rows']), options)
+            return
+        target, process = self.get_target(options)
+        try:
+            results = run(
+                target, options['scenarios'] or SCENARIOS,
+                options['requests'], options['concurrency']
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+        self.report(results, options)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf8') as f:
+                regressions = compare(
+                    results, json.load(f), options['tolerance']
+                )
+            if regressions:
+                raise CommandError(
+                    'Regressions found:\n' + '\n'.join(regressions)
+                )
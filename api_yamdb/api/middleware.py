@@ -0,0 +1,235 @@
+import asyncio
+from bisect import bisect_left
+from contextvars import ContextVar
+from threading import Lock
+from time import perf_counter
+
+from .cache import stats as cache_stats
+from .cache import stats_lock as cache_stats_lock
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+UNMATCHED = 'unmatched'
+
+metrics = {}
+metrics_lock = Lock()
+current_timer = ContextVar('query_timer', default=None)
+
+
+class QueryTimer:
+    """Обёртка execute_wrapper: считает запросы и время в БД."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.count += 1
+
+
+def time_query(execute, sql, params, many, context):
+    """Общая обёртка соединений: передаёт запрос таймеру текущего запроса.
+
+    Соединения у каждого потока свои, а контекст запроса переходит
+    в потоки sync_to_async, поэтому запросы sync-view под ASGI и
+    запросы при отдаче потокового ответа попадают в тот же таймер.
+    """
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.requests = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.serialize = 0.0
+
+    def observe(self, total, queries, db, serialize):
+        self.buckets[bisect_left(BUCKETS, total)] += 1
+        self.requests += 1
+        self.duration += total
+        self.queries += queries
+        self.db += db
+        self.serialize += serialize
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return UNMATCHED
+    return match.view_name or match.route
+
+
+def record(method, route, total, queries, db, serialize):
+    with metrics_lock:
+        route_metrics = metrics.get((method, route))
+        if route_metrics is None:
+            route_metrics = metrics[method, route] = RouteMetrics()
+        route_metrics.observe(total, queries, db, serialize)
+
+
+class TimingMiddleware:
+    """Замеряет запросы к БД, сериализацию и общее время по маршрутам.
+
+    Время сериализации — это время от вызова view до отрисовки ответа
+    без учёта SQL: во вьюсетах DRF оно почти целиком уходит на
+    сериализаторы и рендеринг JSON. Под ASGI middleware работает
+    асинхронно, чтобы не переключать каждый запрос в sync-поток.
+    Потоковые ответы попадают в метрики, когда отдана последняя часть,
+    а Server-Timing у них описывает время до начала отдачи.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = current_timer.set(QueryTimer())
+        request.query_timer = current_timer.get()
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(request, response, started)
+
+    async def __acall__(self, request):
+        token = current_timer.set(QueryTimer())
+        request.query_timer = current_timer.get()
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        return self.finish(request, response, started)
+
+    def measure(self, request, started):
+        timer = request.query_timer
+        finished = perf_counter()
+        serialize = 0.0
+        if hasattr(request, 'view_started'):
+            view_started, db_before_view = request.view_started
+            serialize = max(
+                finished - view_started - (timer.duration - db_before_view),
+                0.0
+            )
+        return finished - started, serialize
+
+    def observe(self, request, total, serialize):
+        timer = request.query_timer
+        record(
+            request.method, get_route(request), total,
+            timer.count, timer.duration, serialize
+        )
+
+    def finish(self, request, response, started):
+        timer = request.query_timer
+        total, serialize = self.measure(request, started)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={timer.duration * 1000:.2f};desc="{timer.count} queries"',
+            f'serialize;dur={serialize * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response.streaming_content, started
+            )
+        else:
+            self.observe(request, total, serialize)
+        return response
+
+    def stream(self, request, content, started):
+        """Отдаёт части ответа, считая их запросы, и пишет метрики в конце."""
+        token = current_timer.set(request.query_timer)
+        try:
+            yield from content
+        finally:
+            current_timer.reset(token)
+            self.observe(request, *self.measure(request, started))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.view_started = (perf_counter(), request.query_timer.duration)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.__class__.process_view(
+            self, request, view_func, view_args, view_kwargs
+        )
+
+
+def label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_metrics():
+    """Отдаёт накопленные метрики в текстовом формате Prometheus."""
+    with metrics_lock:
+        snapshot = {
+            key: (
+                list(value.buckets), value.requests, value.duration,
+                value.queries, value.db, value.serialize
+            )
+            for key, value in metrics.items()
+        }
+    with cache_stats_lock:
+        cache_snapshot = dict(cache_stats)
+    lines = [
+        '# HELP yamdb_request_duration_seconds Request wall time.',
+        '# TYPE yamdb_request_duration_seconds histogram',
+    ]
+    counters = {
+        'yamdb_db_queries_total': ('Database queries.', 3),
+        'yamdb_db_duration_seconds_total': ('Time spent in SQL.', 4),
+        'yamdb_serialize_duration_seconds_total': (
+            'Time spent in views and rendering outside SQL.', 5
+        ),
+    }
+    for (method, route), values in sorted(snapshot.items()):
+        labels = f'method="{label(method)}",route="{label(route)}"'
+        cumulative = 0
+        for bound, value in zip(BUCKETS + ('+Inf',), values[0]):
+            cumulative += value
+            lines.append(
+                f'yamdb_request_duration_seconds_bucket'
+                f'{{{labels},le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'yamdb_request_duration_seconds_sum{{{labels}}} {values[2]}'
+        )
+        lines.append(
+            f'yamdb_request_duration_seconds_count{{{labels}}} {values[1]}'
+        )
+    for name, (help_text, index) in counters.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for (method, route), values in sorted(snapshot.items()):
+            labels = f'method="{label(method)}",route="{label(route)}"'
+            lines.append(f'{name}{{{labels}}} {values[index]}')
+    lines.append('# HELP yamdb_response_cache_total Response cache lookups.')
+    lines.append('# TYPE yamdb_response_cache_total counter')
+    for (group, outcome), value in sorted(cache_snapshot.items()):
+        lines.append(
+            f'yamdb_response_cache_total'
+            f'{{group="{label(group)}",outcome="{label(outcome)}"}} {value}'
+        )
+    return '\n'.join(lines) + '\n'
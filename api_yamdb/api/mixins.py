@@ -1,8 +1,121 @@
+import hashlib
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max, Sum, prefetch_related_objects
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
 
-class CDLSet(CreateModelMixin, ListModelMixin, DestroyModelMixin,
+class StreamingListMixin(ListModelMixin):
+    """Список, который большие страницы сериализует и отдаёт частями.
+
+    Потоковую выдачу включает пагинатор (PageSizePagination), тогда
+    страница читается одним SELECT через серверный курсор по
+    STREAM_CHUNK_SIZE строк и так же частями сериализуется.
+    """
+
+    def get_list_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def serialize_page(self, objects):
+        return self.get_serializer(objects, many=True).data
+
+    def iter_chunks(self, page):
+        size = settings.STREAM_CHUNK_SIZE
+        # В транзакции курсор PostgreSQL не материализуется (WITH HOLD),
+        # а все части видят один снимок данных.
+        with transaction.atomic(using=page.db):
+            rows = page.iterator(chunk_size=size)
+            while True:
+                objects = list(islice(rows, size))
+                # iterator() в Django 3.2 не выполняет prefetch_related
+                prefetch_related_objects(
+                    objects, *page._prefetch_related_lookups
+                )
+                yield self.serialize_page(objects)
+                if len(objects) < size:
+                    return
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.serialize_page(queryset))
+        if getattr(self.paginator, 'streamed', False):
+            return self.get_paginated_response(self.iter_chunks(page))
+        return self.get_paginated_response(self.serialize_page(page))
+
+
+class CDLSet(CreateModelMixin, StreamingListMixin, DestroyModelMixin,
              GenericViewSet):
     pass
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified по дешёвому агрегату над выборкой.
+
+    Ответ 304 отдаётся до сериализации, если клиент прислал
+    совпадающий If-None-Match или свежий If-Modified-Since. Спискам
+    Last-Modified не отдаётся: удаление строки не меняет Max(updated),
+    а ETag учитывает и число строк. Это число списка сохраняется
+    в list_count для count пагинатора. Сумма version_field меняет ETag
+    при смене имени автора: claims_version только растёт.
+    """
+    modified_field = 'updated'
+    version_field = 'author__claims_version'
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional(
+            queryset, super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            queryset = self.get_queryset().filter(pk=kwargs.get('pk'))
+        except (TypeError, ValueError, ValidationError):
+            raise Http404
+        return self.conditional(
+            queryset, super().retrieve, request, *args, **kwargs
+        )
+
+    def check_parent(self):
+        """Для пустого списка: 404, если нет родительского объекта."""
+
+    def conditional(self, queryset, handler, request, *args, **kwargs):
+        state = queryset.order_by().aggregate(
+            last_modified=Max(self.modified_field), count=Count('pk'),
+            version=Sum(self.version_field)
+        )
+        if self.action == 'list':
+            # Тот же COUNT нужен пагинатору: второй запрос не делается.
+            self.list_count = state['count']
+            if not state['count']:
+                self.check_parent()
+        last_modified = None
+        if self.action != 'list' and state['last_modified']:
+            last_modified = int(state['last_modified'].timestamp())
+        raw = '|'.join((
+            str(state['count']), str(state['last_modified']),
+            str(state['version']), request.get_host(), request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
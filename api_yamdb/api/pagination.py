@@ -0,0 +1,228 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import (EmptyPage, InvalidPage, Page,
+                                   PageNotAnInteger, Paginator)
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .counts import get_count
+
+CURSOR_MODE = 'cursor'
+
+
+def cursor_requested(request):
+    if CURSOR_MODE in request.query_params:
+        return True
+    if request.query_params.get('pagination') == CURSOR_MODE:
+        return True
+    for media_type in request.META.get('HTTP_ACCEPT', '').split(','):
+        for param in media_type.split(';')[1:]:
+            key, _, value = param.partition('=')
+            if (key.strip(), value.strip()) == ('pagination', CURSOR_MODE):
+                return True
+    return False
+
+
+class UncountedPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self.next_exists = has_next
+
+    def has_next(self):
+        return self.next_exists
+
+
+class UncountedPaginator(Paginator):
+    """Страницы без COUNT(*): о следующей странице говорит лишняя строка.
+
+    lazy-страница строки не читает: их число (не больше per_page + 1)
+    считается COUNT по срезу. Пустая страница после первой — EmptyPage,
+    как у Paginator.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы не является числом.')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1.')
+        return number
+
+    def page(self, number, lazy=False):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if lazy:
+            found = self.object_list[bottom:top + 1].count()
+            rows = self.object_list[bottom:top]
+        else:
+            rows = list(self.object_list[bottom:top + 1])
+            found = len(rows)
+            rows = rows[:self.per_page]
+        if not found and number > 1:
+            raise EmptyPage('На этой странице нет результатов.')
+        return UncountedPage(rows, number, self, found > self.per_page)
+
+
+class PageSizePagination(PageNumberPagination):
+    """Размер страницы из ``?page_size=`` не больше MAX_PAGE_SIZE.
+
+    ``?count=false`` убирает из ответа count и запрос COUNT(*), а
+    count_mode у view позволяет считать его приближённо (api.counts),
+    а list_count у view — взять уже посчитанное точное число.
+    Страницы больше STREAM_CHUNK_SIZE строк в JSON отдаются потоком:
+    выборка и сериализация идут частями по STREAM_CHUNK_SIZE строк.
+    """
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+
+    @property
+    def max_page_size(self):
+        return settings.MAX_PAGE_SIZE
+
+    def count_requested(self, request):
+        return request.query_params.get(
+            self.count_query_param, ''
+        ).lower() != 'false'
+
+    def is_filtered(self, request, view):
+        """Передан ли непустой параметр одного из filter_backends view."""
+        params = {
+            name for name, value in request.query_params.items() if value
+        }
+        for backend in getattr(view, 'filter_backends', ()):
+            for parameter in backend().get_schema_operation_parameters(view):
+                if parameter['name'] in params:
+                    return True
+        return False
+
+    def stream_requested(self, request, page_size):
+        renderer = request.accepted_renderer
+        return (
+            page_size > settings.STREAM_CHUNK_SIZE
+            and isinstance(renderer, JSONRenderer) and renderer.compact
+            and renderer.get_indent(request.accepted_media_type, {}) is None
+        )
+
+    def get_paginator(self, queryset, page_size, request, view):
+        known = estimate = None
+        if self.counted:
+            known = getattr(view, 'list_count', None)
+            if known is None:
+                estimate = get_count(
+                    view, queryset, self.is_filtered(request, view)
+                )
+        if self.counted and estimate is None:
+            paginator = Paginator(queryset, page_size)
+            if known is not None:
+                # Точное число строк уже посчитано view (ConditionalGetMixin)
+                paginator.count = known
+            return paginator
+        # Приближённый или закешированный count только выводится,
+        # а переход между страницами, как без count, — по лишней строке.
+        paginator = UncountedPaginator(queryset, page_size)
+        if estimate is not None:
+            paginator.count = estimate
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.counted = True
+        self.streamed = False
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.request = request
+        self.counted = self.count_requested(request)
+        self.streamed = self.stream_requested(request, page_size)
+        paginator = self.get_paginator(queryset, page_size, request, view)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            if isinstance(paginator, UncountedPaginator):
+                self.page = paginator.page(page_number, lazy=self.streamed)
+            else:
+                self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        if self.template is not None and self.counted:
+            self.display_page_controls = paginator.num_pages > 1
+        if self.streamed:
+            return self.page.object_list
+        return list(self.page)
+
+    def get_envelope(self, data):
+        envelope = OrderedDict()
+        if self.counted:
+            envelope['count'] = self.page.paginator.count
+        envelope['next'] = self.get_next_link()
+        envelope['previous'] = self.get_previous_link()
+        envelope['results'] = data
+        return envelope
+
+    def get_paginated_response(self, data):
+        """Ответ со страницей; при потоковой выдаче data — части страницы."""
+        if self.streamed:
+            return self.get_streaming_response(data)
+        return Response(self.get_envelope(data))
+
+    def get_streaming_response(self, chunks):
+        renderer = self.request.accepted_renderer
+        head = renderer.render(self.get_envelope([]))
+        return StreamingHttpResponse(
+            self.render_chunks(renderer, head, chunks),
+            content_type=renderer.media_type
+        )
+
+    def render_chunks(self, renderer, head, chunks):
+        # Тело совпадает с обычным ответом: head оканчивается на '[]}'.
+        yield head[:-2]
+        separator = b''
+        for chunk in chunks:
+            if chunk:
+                yield separator + renderer.render(chunk)[1:-1]
+                separator = b','
+        yield head[-2:]
+
+
+class KeysetPagination(PageSizePagination):
+    """Постраничная выдача с переключением на курсорную по запросу.
+
+    Курсорный режим включается параметром ``?pagination=cursor``
+    или заголовком ``Accept: application/json; pagination=cursor``.
+    """
+    cursor_ordering = '-id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if cursor_requested(request):
+            self.streamed = False
+            self.cursor_paginator = CursorPagination()
+            self.cursor_paginator.ordering = self.cursor_ordering
+            self.cursor_paginator.page_size = self.get_page_size(request)
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitlePagination(KeysetPagination):
+    cursor_ordering = '-id'
+
+
+class ReviewPagination(KeysetPagination):
+    cursor_ordering = ('-pub_date', 'id')
+
+
+class CommentPagination(KeysetPagination):
+    cursor_ordering = ('-pub_date', 'id')
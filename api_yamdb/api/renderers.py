@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSON через orjson с тем же результатом, что у JSONRenderer.
+
+    Отступы, ensure_ascii и некомпактный вывод, а также данные, которые
+    orjson не кодирует, передаются обычному JSONRenderer.
+    """
+    options = orjson and (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii
+            or not self.compact or self.get_indent(
+                accepted_media_type, renderer_context or {}
+            ) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=self.options
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как в JSONRenderer: JSON должен оставаться подмножеством JS.
+        return ret.replace(
+            '\u2028'.encode(), b'\\u2028'
+        ).replace('\u2029'.encode(), b'\\u2029')
@@ -1,6 +1,6 @@
 from django.conf import settings
 from rest_framework import serializers
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title, TitleScore
 from reviews.validators import validate_username
 from users.models import User
 
@@ -56,9 +56,15 @@ class TitleGetSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count')
         model = Title
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'stats' in self.context.get('expand', ()):
+            data['stats'] = TitleScore.objects.filter(title=instance).stats()
+        return data
+
 
 class TitlePostSerializer(serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(many=True, slug_field='slug',
@@ -83,15 +89,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         read_only_fields = ('title',)
 
-    def validate(self, data):
-        if Review.objects.filter(
-            author=self.context['request'].user,
-            title_id=self.context['view'].kwargs.get('title_id')
-        ).exists() and self.context['request'].method == 'POST':
-            raise serializers.ValidationError(
-                'Нельзя оставить два отзыва на одно произведение.')
-        return data
-
 
 class SignUpSerializer(serializers.Serializer):
     email = serializers.EmailField(
@@ -0,0 +1,44 @@
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from reviews.models import Category, Genre, GenreTitle, Review, Title
+from users.models import User, forget_claims
+
+from api_yamdb.db import check_connections
+
+from .cache import invalidate
+from .middleware import install_query_timer
+
+CACHE_GROUPS = {
+    Category: ('categories', 'titles'),
+    Genre: ('genres', 'titles'),
+    Title: ('titles',),
+    GenreTitle: ('titles',),
+    Review: ('titles',),
+}
+
+
+def invalidate_response_cache(sender, **kwargs):
+    invalidate(*CACHE_GROUPS[sender])
+
+
+for model in CACHE_GROUPS:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+m2m_changed.connect(invalidate_response_cache, sender=Title.genre.through)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_claims(sender, instance, **kwargs):
+    forget_claims([instance.pk])
+
+
+@receiver(request_started)
+def check_persistent_connections(**kwargs):
+    check_connections()
+
+
+@receiver(connection_created)
+def time_connection_queries(sender, connection, **kwargs):
+    install_query_timer(connection)
@@ -1,11 +1,11 @@
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
 
+from .async_views import AsyncReadRouter
 from .views import (CategoryViewSet, CommentsViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet,
-                    email_verifications, self_registration)
+                    ReviewViewSet, TitleViewSet, UserViewSet, cache_stats,
+                    email_verifications, export_data, self_registration)
 
-router_v1 = DefaultRouter()
+router_v1 = AsyncReadRouter()
 router_v1.register("users", UserViewSet)
 router_v1.register('categories', CategoryViewSet, basename='categories')
 router_v1.register('genres', GenreViewSet, basename='genres')
@@ -23,5 +23,7 @@ auth_patterns = [
 ]
 urlpatterns = [
     path('auth/', include(auth_patterns)),
+    path('cache/stats/', cache_stats, name='cache_stats'),
+    path('export/<slug:name>.<slug:fmt>', export_data, name='export'),
     path('', include(router_v1.urls)),
 ]
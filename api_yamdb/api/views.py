@@ -1,20 +1,31 @@
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import (Http404, HttpResponse, HttpResponseForbidden,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
-from users.models import User
+from rest_framework.settings import api_settings
+from reviews.dump import EXPORTS, FORMATS, stream
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleRanking, TitleScore)
+from users.models import OutgoingEmail, User
 
-from .filters import TitleFilter
-from .mixins import CDLSet
+from .authentication import ClaimsAccessToken, load_user
+from .bulk import SlugBulkMixin, TitleBulkMixin
+from .cache import CachedListMixin, CachedResponseMixin, stats
+from .counts import ESTIMATE
+from .fast import (FastCommentSerializer, FastReadMixin, FastReviewSerializer,
+                   FastTitleSerializer)
+from .filters import TitleExactFilter, TitleFilter
+from .middleware import render_metrics
+from .mixins import CDLSet, ConditionalGetMixin, StreamingListMixin
+from .pagination import CommentPagination, ReviewPagination, TitlePagination
 from .permissions import (IsAdmin, IsAdminModeratorOwnerOrReadOnly,
                           IsAdminOrReadOnly)
 from .serializers import (CategorySerializer, CommentsSerializer,
@@ -24,10 +35,11 @@ from .serializers import (CategorySerializer, CommentsSerializer,
                           TitlePostSerializer, UserSerializer)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(StreamingListMixin, viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    count_mode = ESTIMATE
     permission_classes = (IsAdmin,)
     lookup_field = "username"
     filter_backends = (filters.SearchFilter,)
@@ -41,12 +53,12 @@ class UserViewSet(viewsets.ModelViewSet):
     def me(self, request):
         if request.method == "PATCH":
             serializer = ProfileEditSerializer(
-                request.user, data=request.data, partial=True
+                load_user(request.user), data=request.data, partial=True
             )
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(load_user(request.user))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -73,11 +85,11 @@ def self_registration(request):
             status.HTTP_400_BAD_REQUEST
         )
     code = default_token_generator.make_token(user)
-    send_mail(
-        'Код токена',
-        f'Код для получения токена {code}',
-        settings.DEFAULT_FROM_EMAIL,
-        [serializer.validated_data.get('email')]
+    OutgoingEmail.objects.create(
+        subject='Код токена',
+        body=f'Код для получения токена {code}',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=serializer.validated_data.get('email')
     )
     return Response(
         serializer.data, status=status.HTTP_200_OK
@@ -95,14 +107,47 @@ def email_verifications(request):
     )
     code = serializer.validated_data["confirmation_code"]
     if default_token_generator.check_token(user, code):
-        token = AccessToken.for_user(user)
+        token = ClaimsAccessToken.for_user(user)
         data = {'token': str(token)}
         return Response(data, status=status.HTTP_200_OK)
     return Response({'confirmation_code': 'Неверный код подтверждения'},
                     status=status.HTTP_400_BAD_REQUEST)
 
 
-class CategoryViewSet(CDLSet):
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def export_data(request, name, fmt):
+    if name not in EXPORTS or fmt not in FORMATS:
+        raise Http404
+    response = StreamingHttpResponse(
+        stream(name, fmt), content_type=FORMATS[fmt]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{name}.{fmt}"'
+    )
+    return response
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def cache_stats(request):
+    return Response([
+        {'group': group, 'outcome': outcome, 'count': value}
+        for (group, outcome), value in sorted(stats.items())
+    ])
+
+
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if token and request.META.get('HTTP_AUTHORIZATION') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(), content_type='text/plain; version=0.0.4'
+    )
+
+
+class CategoryViewSet(SlugBulkMixin, CachedListMixin, CDLSet):
+    cache_group = 'categories'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
@@ -111,7 +156,8 @@ class CategoryViewSet(CDLSet):
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class GenreViewSet(CDLSet):
+class GenreViewSet(SlugBulkMixin, CachedListMixin, CDLSet):
+    cache_group = 'genres'
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
     lookup_field = 'slug'
@@ -120,63 +166,142 @@ class GenreViewSet(CDLSet):
     permission_classes = (IsAdminOrReadOnly,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(TitleBulkMixin, CachedResponseMixin, FastReadMixin,
+                   viewsets.ModelViewSet):
+    cache_group = 'titles'
+    queryset = Title.objects.with_related()
+    fast_serializer_class = FastTitleSerializer
+    count_mode = ESTIMATE
     filter_backends = (DjangoFilterBackend,)
-    filterset_class = TitleFilter
+    pagination_class = TitlePagination
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (IsAdminOrReadOnly,)
 
-    def get_queryset(self):
-        return Title.objects.annotate(
-            rating=Avg('reviews__score')).order_by('-id')
+    @property
+    def filterset_class(self):
+        match = self.request.query_params.get(
+            'match', settings.TITLE_FILTER_MATCH
+        )
+        return TitleExactFilter if match == 'exact' else TitleFilter
 
     def get_serializer_class(self):
         if self.request.method == 'GET':
             return TitleGetSerializer
         return TitlePostSerializer
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'retrieve':
+            context['expand'] = self.request.query_params.get(
+                'expand', ''
+            ).split(',')
+        return context
+
+    @action(detail=True)
+    def stats(self, request, pk=None):
+        return self.cached(self.get_stats, request, pk=pk)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_stats(self, request, pk):
+        if not pk.isdigit():
+            raise Http404
+        stats = TitleScore.objects.filter(title_id=pk).stats()
+        if not stats['count'] and not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response(stats)
+
+    @action(detail=False)
+    def top(self, request):
+        return self.ranking(request, TitleRanking.TOP)
+
+    @action(detail=False)
+    def trending(self, request):
+        return self.ranking(request, TitleRanking.TRENDING)
+
+    def ranking(self, request, kind):
+        genre = request.query_params.get('genre')
+        category = request.query_params.get('category')
+        if genre and category:
+            raise ValidationError(
+                {'detail': 'Укажите либо genre, либо category.'}
+            )
+        rankings = TitleRanking.objects.filter(kind=kind)
+        if genre:
+            rankings = rankings.filter(genre__slug=genre)
+        elif category:
+            rankings = rankings.filter(category__slug=category)
+        else:
+            rankings = rankings.filter(genre=None, category=None)
+        rankings = rankings.select_related(
+            'title__category'
+        ).prefetch_related('title__genre').order_by('position')
+        serializer = self.get_serializer(
+            [ranking.title for ranking in rankings], many=True
+        )
+        return Response(serializer.data)
+
+
+class ReviewViewSet(ConditionalGetMixin, FastReadMixin,
+                    viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     serializer_class = ReviewSerializer
+    fast_serializer_class = FastReviewSerializer
     permission_classes = (IsAdminModeratorOwnerOrReadOnly,)
+    pagination_class = ReviewPagination
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        titles = get_object_or_404(Title, pk=title_id)
-        return titles.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs['title_id']
+        ).select_related('author')
+
+    def check_parent(self):
+        if not Title.objects.filter(pk=self.kwargs['title_id']).exists():
+            raise Http404
 
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        serializer.save(author=self.request.user, title=title)
+        """Вставляет отзыв без предварительных проверок.
+
+        Повторный отзыв отсекает ограничение unique_title_author, а
+        несуществующее произведение — обновление рейтинга, не нашедшее
+        строку: такой отзыв остаётся неучтённым и откатывается.
+        Запросы для выбора ответа делаются только при ошибке.
+        """
+        title_id = int(self.kwargs['title_id'])
+        try:
+            with transaction.atomic():
+                review = serializer.save(
+                    author=self.request.user, title_id=title_id
+                )
+                if not review.is_rated:
+                    raise Http404
+        except IntegrityError:
+            if not Title.objects.filter(pk=title_id).exists():
+                raise Http404
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [settings.REVIEW_EXISTS]}
+            )
 
 
-class CommentsViewSet(viewsets.ModelViewSet):
+class CommentsViewSet(ConditionalGetMixin, FastReadMixin,
+                      viewsets.ModelViewSet):
     serializer_class = CommentsSerializer
+    fast_serializer_class = FastCommentSerializer
     permission_classes = [IsAdminModeratorOwnerOrReadOnly]
+    pagination_class = CommentPagination
 
-    # def get_queryset(self):
-    #     review = get_object_or_404(
-    #         Review,
-    #         id=self.kwargs.get('review_id'),
-    #         title__id=self.kwargs.get('title_id')
-    #     )
-    #     if review is not None:
-    #         return review.comments.all()
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs['review_id'],
+            review__title_id=self.kwargs['title_id']
+        ).select_related('author')
+
+    def check_parent(self):
+        if not Review.objects.filter(
+            pk=self.kwargs['review_id'], title_id=self.kwargs['title_id']
+        ).exists():
+            raise Http404
 
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            id=self.kwargs.get('review_id'),
-            title__id=self.kwargs.get('title_id')
+        self.check_parent()
+        serializer.save(
+            author=self.request.user, review_id=int(self.kwargs['review_id'])
         )
-        if review is not None:
-            serializer.save(author=self.request.user, review=review)
@@ -0,0 +1,57 @@
+from django.db import connections
+
+
+def is_healthy(connection):
+    """Проверяет соединение DB-API (psycopg2, sqlite3) запросом SELECT 1.
+
+    Курсор закрывается явно: курсор sqlite3 не контекстный менеджер.
+    """
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+class HealthCheckMixin:
+    """Проверка постоянного соединения для DatabaseWrapper проекта.
+
+    Аналог CONN_HEALTH_CHECKS из Django 4.1: check_connections()
+    помечает соединения, пережившие прошлый запрос, а SELECT 1
+    выполняется в ensure_connection, когда новый запрос впервые
+    обращается к БД. Не ответившее соединение открывается заново.
+    """
+    health_check_done = True
+
+    def mark_health_check(self):
+        if (
+            self.connection is not None
+            and self.settings_dict.get('CONN_HEALTH_CHECKS')
+        ):
+            self.health_check_done = False
+
+    def ensure_connection(self):
+        if not self.health_check_done:
+            self.health_check_done = True
+            if (
+                self.connection is not None
+                and not self.in_atomic_block
+                and not is_healthy(self.connection)
+            ):
+                self.close()
+        super().ensure_connection()
+
+
+def check_connections():
+    """Помечает постоянные соединения для проверки перед использованием.
+
+    Проверяются только backend-ы проекта (api_yamdb.db.postgresql,
+    api_yamdb.db.sqlite3, api_yamdb.db.pooled).
+    """
+    for connection in connections.all():
+        if isinstance(connection, HealthCheckMixin):
+            connection.mark_health_check()
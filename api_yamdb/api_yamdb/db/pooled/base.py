@@ -0,0 +1,99 @@
+"""PostgreSQL backend, который берёт соединения из пула внутри процесса.
+
+Включается через DB_ENGINE=api_yamdb.db.pooled. В конце каждого запроса
+Django возвращает соединение в пул, CONN_MAX_AGE не учитывается.
+"""
+import os
+import time
+from threading import BoundedSemaphore, Lock
+
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+from .. import is_healthy
+from ..postgresql.base import DatabaseWrapper as HealthCheckedWrapper
+
+pools = {}
+pools_lock = Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size, timeout):
+        self.idle = []
+        self.lock = Lock()
+        self.slots = BoundedSemaphore(max_size)
+        self.timeout = timeout
+
+    def acquire(self, connect, health_check):
+        if not self.slots.acquire(timeout=self.timeout):
+            raise base.Database.OperationalError(
+                'connection pool exhausted'
+            )
+        try:
+            while True:
+                with self.lock:
+                    connection = self.idle.pop() if self.idle else None
+                if connection is None:
+                    return connect()
+                if not connection.closed and (
+                    not health_check or is_healthy(connection)
+                ):
+                    return connection
+                connection.close()
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, connection):
+        try:
+            if connection.info.transaction_status not in (
+                extensions.TRANSACTION_STATUS_IDLE,
+                extensions.TRANSACTION_STATUS_UNKNOWN,
+            ):
+                connection.rollback()
+            if connection.info.transaction_status != (
+                extensions.TRANSACTION_STATUS_IDLE
+            ):
+                connection.close()
+        except base.Database.Error:
+            connection.close()
+        finally:
+            if not connection.closed:
+                with self.lock:
+                    self.idle.append(connection)
+            self.slots.release()
+
+
+def get_pool(settings_dict, conn_params):
+    # После fork дочерний процесс не трогает соединения родителя.
+    key = (os.getpid(), repr(sorted(conn_params.items())))
+    with pools_lock:
+        if key not in pools:
+            pools[key] = ConnectionPool(
+                settings_dict.get('POOL_MAX_SIZE', 20),
+                settings_dict.get('POOL_TIMEOUT', 30),
+            )
+        return pools[key]
+
+
+class DatabaseWrapper(HealthCheckedWrapper):
+
+    def connect(self):
+        super().connect()
+        # CONN_MAX_AGE не действует: в конце запроса соединение
+        # возвращается в пул, а не остаётся за потоком.
+        self.close_at = time.monotonic()
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(self.settings_dict, conn_params)
+        return self.pool.acquire(
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+        )
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.release(self.connection)
@@ -0,0 +1,11 @@
+"""PostgreSQL backend с проверкой постоянных соединений.
+
+Включается через DB_ENGINE=api_yamdb.db.postgresql.
+"""
+from django.db.backends.postgresql import base
+
+from .. import HealthCheckMixin
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    pass
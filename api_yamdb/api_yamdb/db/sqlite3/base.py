@@ -0,0 +1,11 @@
+"""SQLite backend с проверкой постоянных соединений.
+
+Включается через DB_ENGINE=api_yamdb.db.sqlite3.
+"""
+from django.db.backends.sqlite3 import base
+
+from .. import HealthCheckMixin
+
+
+class DatabaseWrapper(HealthCheckMixin, base.DatabaseWrapper):
+    pass
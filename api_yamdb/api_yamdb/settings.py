@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'reviews.apps.ReviewsConfig',
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,10 +72,51 @@ DATABASES = {
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'PORT': os.getenv('DB_PORT'),
+        # Keep connections open between requests; 0 closes them every time
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Ping reused connections with SELECT 1 before handing them out
+        # (project backends: api_yamdb.db.postgresql, api_yamdb.db.pooled)
+        'CONN_HEALTH_CHECKS': os.getenv(
+            'DB_CONN_HEALTH_CHECKS', default='true'
+        ).lower() == 'true',
+        # Used by DB_ENGINE=api_yamdb.db.pooled only
+        'POOL_MAX_SIZE': int(os.getenv('DB_POOL_MAX_SIZE', default=20)),
+        'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=30)),
     }
 }
 
+# docker-compose sets memcached; LocMem is per process, so the JWT claims
+# fast path (api.authentication) reads users from the DB with it
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
+# Title filter mode: 'contains' or 'exact', overridable with ?match=
+TITLE_FILTER_MATCH = os.getenv('TITLE_FILTER_MATCH', default='contains')
+
+# Serve title/review/comment reads from async views; enabled by asgi.py
+ASYNC_READ_VIEWS = os.getenv(
+    'ASYNC_READ_VIEWS', default='false'
+).lower() == 'true'
+# Threads (and so database connections) per worker for async reads
+ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', default=10))
+# Serialize title/review/comment reads from values() rows (api/fast.py)
+FAST_READ_SERIALIZERS = os.getenv(
+    'FAST_READ_SERIALIZERS', default='true'
+).lower() == 'true'
+
+# Bearer token required by /metrics; the endpoint is open when empty
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,18 +155,34 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    "DEFAULT_RENDERER_CLASSES": (
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageSizePagination',
     'PAGE_SIZE': 5,
 }
+# Largest ?page_size= a client may ask for
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', default=1000))
+# Pages with more rows are fetched, serialized and sent in chunks of this size
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', default=200))
+# Viewsets with count_mode 'estimate' trust table statistics from this size
+COUNT_ESTIMATE_MIN = int(os.getenv('COUNT_ESTIMATE_MIN', default=10000))
+# Seconds to cache exact counts of filtered lists for such viewsets
+COUNT_CACHE_TIMEOUT = int(os.getenv('COUNT_CACHE_TIMEOUT', default=30))
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=7),
     "AUTH_HEADER_TYPES": ("Bearer",),
 }
+# Seconds to keep users' claims_version in a shared (non-LocMem) cache
+JWT_CLAIMS_CACHE_TIMEOUT = int(
+    os.getenv('JWT_CLAIMS_CACHE_TIMEOUT', default=60)
+)
 
 CATALOGS_DATA = BASE_DIR / 'static' / 'data'
 
@@ -138,5 +197,6 @@ EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
 DEFAULT_FROM_EMAIL = "yamdb@yamdb.com"
 EMAIL_EXISTS = 'Такой email существует'
 NAME_EXISTS = 'Такое имя существует'
+REVIEW_EXISTS = 'Нельзя оставить два отзыва на одно произведение.'
 AUTH_USER_MODEL = 'users.User'
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
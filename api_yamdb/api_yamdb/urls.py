@@ -1,3 +1,4 @@
+from api.views import metrics
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
@@ -7,6 +8,7 @@ from django.views.generic import TemplateView
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include('api.urls')),
+    path('metrics', metrics, name='metrics'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
@@ -0,0 +1,14 @@
+import os
+
+# SERVER_MODE=asgi serves api_yamdb.asgi with uvicorn workers, where title,
+# review and comment reads run in async views; wsgi keeps sync workers.
+SERVER_MODE = os.getenv('SERVER_MODE', default='wsgi')
+
+bind = os.getenv('GUNICORN_BIND', default='0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', default=1))
+
+if SERVER_MODE == 'asgi':
+    wsgi_app = 'api_yamdb.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'api_yamdb.wsgi:application'
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, GenreTitle, Review, Title
+from .models import (Category, Comment, Genre, GenreTitle, Review, Title,
+                     TitleRanking)
 
 admin.site.register(Genre)
 admin.site.register(Category)
@@ -13,6 +14,9 @@ class TitleAdmin(admin.ModelAdmin):
     list_filter = ('category', )
     empty_value_display = '-пусто-'
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_related()
+
 
 @admin.register(GenreTitle)
 class GenreTitleAdmin(admin.ModelAdmin):
@@ -36,3 +40,11 @@ class CommentAdmin(admin.ModelAdmin):
     list_filter = ('review', 'author',)
     search_fields = ('text',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(TitleRanking)
+class TitleRankingAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'kind', 'genre', 'category', 'position', 'title',
+                    'score', 'refreshed')
+    list_filter = ('kind', 'genre', 'category')
+    empty_value_display = '-пусто-'
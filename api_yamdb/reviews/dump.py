@@ -0,0 +1,85 @@
+import csv
+import json
+from datetime import datetime
+
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+EXPORTS = {
+    'users': ('users.csv', User, (
+        'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    )),
+    'categories': ('category.csv', Category, ('id', 'name', 'slug')),
+    'genres': ('genre.csv', Genre, ('id', 'name', 'slug')),
+    'titles': ('titles.csv', Title, (
+        'id', 'name', 'year', 'description', 'category'
+    )),
+    'reviews': ('review.csv', Review, (
+        'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+    )),
+    'comments': ('comments.csv', Comment, (
+        'id', 'review_id', 'text', 'author', 'pub_date'
+    )),
+    'genre_titles': ('genre_title.csv', GenreTitle, (
+        'id', 'title_id', 'genre_id'
+    )),
+}
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def to_text(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_rows(name, chunk_size=CHUNK_SIZE):
+    _, model, header = EXPORTS[name]
+    columns = [
+        model._meta.get_field(column.replace('_id', '')).attname
+        for column in header
+    ]
+    return model.objects.order_by('pk').values_list(*columns).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def iter_chunks(name, fmt, chunk_size=CHUNK_SIZE):
+    """Отдаёт таблицу кусками в формате файлов load_data.
+
+    Каждый кусок — пара из текста и числа строк таблицы в нём.
+    """
+    header = EXPORTS[name][2]
+    if fmt == 'csv':
+        writer = csv.writer(Echo(), dialect='excel')
+        yield writer.writerow(header), 0
+    lines = []
+    for row in iter_rows(name, chunk_size):
+        row = [to_text(value) for value in row]
+        if fmt == 'csv':
+            lines.append(writer.writerow(
+                ['' if value is None else value for value in row]
+            ))
+        else:
+            lines.append(
+                json.dumps(dict(zip(header, row)), ensure_ascii=False) + '\n'
+            )
+        if len(lines) == chunk_size:
+            yield ''.join(lines), len(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines), len(lines)
+
+
+def stream(name, fmt, chunk_size=CHUNK_SIZE):
+    for text, _ in iter_chunks(name, fmt, chunk_size):
+        yield text
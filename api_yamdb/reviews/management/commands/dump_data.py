@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from reviews.dump import CHUNK_SIZE, EXPORTS, FORMATS, iter_chunks
+
+
+class Command(BaseCommand):
+    help = 'Dump tables into files readable by load_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*',
+            help=f'Tables to dump ({", ".join(EXPORTS)}), all by default'
+        )
+        parser.add_argument(
+            '--path', default=settings.CATALOGS_DATA,
+            help='Directory for dumped files'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS, default='csv', dest='fmt'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE,
+            help='Number of rows fetched from the database cursor at once'
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(EXPORTS)
+        if unknown:
+            raise CommandError(f'Unknown tables: {", ".join(sorted(unknown))}')
+        os.makedirs(options['path'], exist_ok=True)
+        for name in options['names'] or EXPORTS:
+            csv_file = EXPORTS[name][0]
+            filename = csv_file.replace('.csv', f'.{options["fmt"]}')
+            started = time.monotonic()
+            rows = 0
+            with open(
+                os.path.join(options['path'], filename), 'w',
+                encoding='utf8', newline=''
+            ) as f:
+                for text, count in iter_chunks(
+                    name, options['fmt'], options['chunk_size']
+                ):
+                    f.write(text)
+                    rows += count
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'{filename}: {rows} rows in {elapsed:.2f}s '
+                f'({rows / elapsed:.0f} rows/sec)'
+            )
@@ -1,14 +1,23 @@
 import csv
+import io
+import multiprocessing
 import os
-from typing import List
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
+from api.cache import invalidate
+from api.signals import CACHE_GROUPS
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
 from django.core.management import BaseCommand, CommandError
-from django.shortcuts import get_object_or_404
-from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title, TitleScore)
 from users.models import User
 
-from api_yamdb.settings import BASE_DIR
-
 CSV_FILES = (
     ('users.csv', User),
     ('category.csv', Category),
@@ -26,65 +35,478 @@ FOREIGN_FIELD_NAMES = {
     'category': Category,
     'genre_title': GenreTitle
 }
+BATCH_SIZE = 1000
+ENGINES = ('orm', 'copy')
+CHUNK_SIZE_MB = 64
 
 
-def check_fields(fields_name: List[str], model_fields: List[str]):
-    for i, _ in enumerate(fields_name):
-        fields_name[i] = fields_name[i].lower()
-        fields_name[i] = fields_name[i].replace('_id', '')
-        if not fields_name[i] in model_fields:
+def get_fields(header, model):
+    fields = []
+    for name in header:
+        name = name.lower().replace('_id', '')
+        try:
+            fields.append(model._meta.get_field(name))
+        except FieldDoesNotExist:
             raise CommandError(
-                f"{fields_name[i]} field doesn't exist "
-                "in {Model} Model"
+                f"{name} field doesn't exist in {model.__name__} Model"
             )
+    return fields
 
 
-def save_model(model, row, fields_name):
-    try:
-        obj = model()
-        for i, field in enumerate(row):
-            if fields_name[i] in FOREIGN_FIELD_NAMES.keys():
-                foreign_model = FOREIGN_FIELD_NAMES[fields_name[i]]
-                field = get_object_or_404(foreign_model, id=field)
-            setattr(obj, fields_name[i], field)
-        obj.save()
-    except Exception as e:
-        raise CommandError(e)
-
-
-def process_file(csv_file, model):
-    path = os.path.join(BASE_DIR, f'static/data/{csv_file}')
-    model_fields = [f.name for f in model._meta.fields]
-    with open(path, 'rt', encoding="utf8") as f:
-        reader = csv.reader(f, dialect='excel')
-        fields_name = next(reader)
-        check_fields(fields_name, model_fields)
-        for row in reader:
-            save_model(model, row, fields_name)
-
-
-def process_genre_title():
-    with open(
-        os.path.join(BASE_DIR, 'static/data/genre_title.csv'),
-        'rt',
-        encoding="utf8"
-    ) as f:
+def get_id_map(fields):
+    return {
+        field.name: set(
+            FOREIGN_FIELD_NAMES[field.name].objects.values_list(
+                'pk', flat=True
+            )
+        )
+        for field in fields if field.name in FOREIGN_FIELD_NAMES
+    }
+
+
+def get_waves():
+    models = {model for _, model in CSV_FILES}
+    dependencies = {
+        csv_file: {
+            FOREIGN_FIELD_NAMES[field.name]
+            for field in model._meta.concrete_fields
+            if FOREIGN_FIELD_NAMES.get(field.name) in models
+        }
+        for csv_file, model in CSV_FILES
+    }
+    waves, loaded, pending = [], set(), list(CSV_FILES)
+    while pending:
+        wave = [(csv_file, model) for csv_file, model in pending
+                if dependencies[csv_file] <= loaded]
+        if not wave:
+            raise CommandError('Circular dependency between csv files')
+        waves.append(wave)
+        loaded |= {model for _, model in wave}
+        pending = [item for item in pending if item not in wave]
+    return waves
+
+
+def build_objects(model, fields, reader, id_map):
+    for row in reader:
+        values = {}
+        for field, value in zip(fields, row):
+            if field.name in id_map:
+                value = int(value) if value else None
+                if value is not None and value not in id_map[field.name]:
+                    raise CommandError(
+                        f'line {reader.line_num}: {field.name} '
+                        f"with id={value} doesn't exist"
+                    )
+            values[field.attname] = value
+        yield model(**values)
+
+
+def get_timestamp_fields(fields):
+    return [
+        field for field in fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+
+
+def create_batch(model, batch, timestamps, batch_size):
+    """bulk_create с датами auto_now/auto_now_add из csv.
+
+    pre_save в bulk_create заменяет их текущим временем, поэтому
+    значения из файла записываются следом через bulk_update.
+    """
+    saved = [
+        [getattr(obj, field.attname) for field in timestamps]
+        for obj in batch
+    ]
+    model.objects.bulk_create(batch, batch_size=batch_size)
+    if not timestamps:
+        return
+    for obj, values in zip(batch, saved):
+        for field, value in zip(timestamps, values):
+            setattr(obj, field.attname, value)
+    model.objects.bulk_update(
+        batch, [field.name for field in timestamps], batch_size=batch_size
+    )
+
+
+def process_file(path, model, batch_size, byte_range=None):
+    header, data_start = read_header(path)
+    fields = get_fields(header, model)
+    timestamps = get_timestamp_fields(fields)
+    if timestamps and not any(field.primary_key for field in fields) and (
+        not connection.features.can_return_rows_from_bulk_insert
+    ):
+        raise CommandError(
+            f'{model._meta.pk.name} column is required to keep '
+            f'{", ".join(field.name for field in timestamps)}'
+        )
+    with open_range(path, byte_range or (data_start, None)) as f:
         reader = csv.reader(f, dialect='excel')
-        next(reader)
-        for row in reader:
-            try:
-                title = get_object_or_404(Title, id=int(row[1]))
-                genre = get_object_or_404(Genre, id=int(row[2]))
-                title.genre.add(genre)
-                title.save()
-            except Exception as e:
-                raise CommandError(e)
+        objects = build_objects(model, fields, reader, get_id_map(fields))
+        rows = 0
+        with transaction.atomic():
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    break
+                create_batch(model, batch, timestamps, batch_size)
+                rows += len(batch)
+    return rows
+
+
+def get_defaults(model, fields):
+    defaults = {}
+    for field in model._meta.concrete_fields:
+        if field in fields or field.primary_key or field.null:
+            continue
+        if getattr(field, 'auto_now', False) or getattr(
+            field, 'auto_now_add', False
+        ):
+            value = timezone.now()
+        else:
+            value = field.get_default()
+        defaults[field.column] = field.get_db_prep_save(value, connection)
+    return defaults
+
+
+def stage_file(cursor, file, staging, columns):
+    column_list = ', '.join(columns)
+    if connection.vendor == 'postgresql':
+        cursor.copy_expert(
+            f'COPY {staging} ({column_list}) FROM STDIN WITH '
+            f'(FORMAT csv, FORCE_NOT_NULL ({column_list}))',
+            file
+        )
+        return
+    cursor.executemany(
+        f'INSERT INTO {staging} ({column_list}) '
+        f'VALUES ({", ".join(["%s"] * len(columns))})',
+        csv.reader(file, dialect='excel')
+    )
+
+
+def cast(expression, field):
+    if field.null:
+        expression = f"NULLIF({expression}, '')"
+    if connection.vendor == 'sqlite':
+        return expression
+    return f'CAST({expression} AS {field.cast_db_type(connection)})'
+
+
+def check_foreign_keys(cursor, staging, fields):
+    qn = connection.ops.quote_name
+    for field in fields:
+        if field.name not in FOREIGN_FIELD_NAMES:
+            continue
+        target = FOREIGN_FIELD_NAMES[field.name]._meta
+        column = qn(field.column)
+        cursor.execute(
+            f'SELECT s.{column} FROM {staging} s '
+            f"WHERE s.{column} <> '' AND NOT EXISTS ("
+            f'SELECT 1 FROM {qn(target.db_table)} t '
+            f'WHERE t.{qn(target.pk.column)} = '
+            f'{cast(f"s.{column}", field)})'
+        )
+        missing = cursor.fetchone()
+        if missing is not None:
+            raise CommandError(
+                f"{field.name} with id={missing[0]} doesn't exist"
+            )
+
+
+class ByteRange(io.RawIOBase):
+    """Чтение файла до заданного смещения."""
+
+    def __init__(self, file, end):
+        self.file = file
+        self.end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = len(buffer)
+        if self.end is not None:
+            size = min(size, self.end - self.file.tell())
+        if size <= 0:
+            return 0
+        data = self.file.read(size)
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.file.close()
+        super().close()
+
+
+def open_range(path, byte_range):
+    start, end = byte_range
+    file = open(path, 'rb')
+    file.seek(start)
+    return io.TextIOWrapper(
+        io.BufferedReader(ByteRange(file, end)),
+        encoding='utf8', newline=''
+    )
+
+
+def read_header(path):
+    """Возвращает заголовок csv и смещение первой строки данных."""
+    with open(path, 'rb') as f:
+        line = f.readline()
+    return next(csv.reader([line.decode('utf8')], dialect='excel')), len(line)
+
+
+def get_ranges(path, chunks):
+    """Делит данные файла на chunks диапазонов байт по границам записей.
+
+    Файл просматривается один раз без разбора csv: перевод строки
+    считается концом записи, только если до него чётное число кавычек.
+    """
+    _, start = read_header(path)
+    size = os.path.getsize(path)
+    boundaries = [start]
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position, quotes = start, 0
+        for number in range(1, chunks):
+            target = start + (size - start) * number // chunks
+            while position < target:
+                block = f.read(min(1024 * 1024, target - position))
+                quotes += block.count(b'"')
+                position += len(block)
+            line = f.readline()
+            quotes += line.count(b'"')
+            position += len(line)
+            while quotes % 2 and line:
+                line = f.readline()
+                quotes += line.count(b'"')
+                position += len(line)
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    if size > boundaries[-1]:
+        boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def copy_file(path, model, byte_range=None):
+    qn = connection.ops.quote_name
+    table = model._meta.db_table
+    staging = qn(f'staging_{table}')
+    header, data_start = read_header(path)
+    fields = get_fields(header, model)
+    with open_range(path, byte_range or (data_start, None)) as f:
+        columns = [qn(field.column) for field in fields]
+        defaults = get_defaults(model, fields)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {staging}')
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging} '
+                f'({", ".join(f"{column} text" for column in columns)})'
+            )
+            stage_file(cursor, f, staging, columns)
+            check_foreign_keys(cursor, staging, fields)
+            selected = [cast(column, field)
+                        for column, field in zip(columns, fields)]
+            cursor.execute(
+                f'INSERT INTO {qn(table)} '
+                f'({", ".join(columns + [qn(c) for c in defaults])}) '
+                f'SELECT {", ".join(selected + ["%s"] * len(defaults))} '
+                f'FROM {staging}',
+                list(defaults.values())
+            )
+            return cursor.rowcount
+
+
+def reset_sequences(models):
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def load_file(csv_file, options, byte_range=None):
+    model = dict(CSV_FILES)[csv_file]
+    path = os.path.join(options['path'], csv_file)
+    try:
+        if options['engine'] == 'copy':
+            return copy_file(path, model, byte_range)
+        return process_file(path, model, options['batch_size'], byte_range)
+    except CommandError as error:
+        raise CommandError(f'{csv_file}: {error}')
+
+
+def read_ids(path, model, byte_range):
+    header, _ = read_header(path)
+    fields = get_fields(header, model)
+    index = [field.primary_key for field in fields].index(True)
+    with open_range(path, byte_range) as f:
+        for row in csv.reader(f, dialect='excel'):
+            yield model._meta.pk.to_python(row[index])
+
+
+def check_pk_columns(options):
+    """Проверяет до параллельной загрузки, что в каждом csv есть id.
+
+    По id удаляются строки закоммиченных частей, если загрузка
+    не удалась; без него откатить их нельзя.
+    """
+    for csv_file, model in CSV_FILES:
+        header, _ = read_header(os.path.join(options['path'], csv_file))
+        try:
+            fields = get_fields(header, model)
+        except CommandError as error:
+            raise CommandError(f'{csv_file}: {error}')
+        if not any(field.primary_key for field in fields):
+            raise CommandError(
+                f'{csv_file}: parallel loading requires '
+                f'the {model._meta.pk.name} column, use --workers 1'
+            )
+
+
+def delete_loaded(loaded, options):
+    """Удаляет строки, записанные частями файлов до ошибки.
+
+    Части коммитятся в своих процессах, поэтому при ошибке их строки
+    удаляются по id из тех же диапазонов файла, от зависимых таблиц
+    к главным. Вставка с существующим id не проходит, так что удаляются
+    только строки этой загрузки.
+    """
+    qn = connection.ops.quote_name
+    with transaction.atomic(), connection.cursor() as cursor:
+        for csv_file, byte_range in reversed(loaded):
+            model = dict(CSV_FILES)[csv_file]
+            ids = read_ids(
+                os.path.join(options['path'], csv_file), model, byte_range
+            )
+            while True:
+                batch = list(islice(ids, BATCH_SIZE))
+                if not batch:
+                    break
+                cursor.execute(
+                    f'DELETE FROM {qn(model._meta.db_table)} '
+                    f'WHERE {qn(model._meta.pk.column)} IN '
+                    f'({", ".join(["%s"] * len(batch))})',
+                    batch
+                )
+
+
+def get_chunks(path, options):
+    size = os.path.getsize(path) / (1024 * 1024)
+    return max(1, min(options['workers'], int(size // options['chunk_size'])))
 
 
 class Command(BaseCommand):
     help = 'Load csv files into the database'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=settings.CATALOGS_DATA,
+            help='Directory with csv files'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Number of rows per INSERT'
+        )
+        parser.add_argument(
+            '--engine', choices=ENGINES, default='orm',
+            help='orm: bulk_create; copy: COPY into staging tables '
+                 '(executemany on SQLite) and INSERT ... SELECT'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Number of worker processes with their own connections; '
+                 'independent files and chunks of big files load in '
+                 'parallel (PostgreSQL only). On failure rows of the '
+                 'chunks already committed are deleted'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=CHUNK_SIZE_MB,
+            help='Split files bigger than this many megabytes into byte '
+                 'ranges at record boundaries loaded by separate workers'
+        )
+
     def handle(self, *args, **options):
-        for csv_file, model in CSV_FILES:
-            process_file(csv_file, model)
-        process_genre_title()
+        if options['workers'] > 1 and connection.vendor == 'sqlite':
+            raise CommandError('Parallel loading requires PostgreSQL')
+        for csv_file, _ in CSV_FILES:
+            path = os.path.join(options['path'], csv_file)
+            if not os.path.exists(path):
+                raise CommandError(f'{path} not found')
+        if options['workers'] > 1:
+            check_pk_columns(options)
+            connections.close_all()
+            loaded = []
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=options['workers'],
+                    mp_context=multiprocessing.get_context('fork')
+                ) as pool:
+                    for wave in get_waves():
+                        self.load_wave(wave, options, pool, loaded)
+            except CommandError as error:
+                self.delete_loaded(error, loaded, options)
+                raise
+        else:
+            with transaction.atomic():
+                for wave in get_waves():
+                    self.load_wave(wave, options)
+        reset_sequences([model for _, model in CSV_FILES])
+        Title.objects.rebuild_rating()
+        TitleScore.objects.rebuild()
+        # bulk_create и COPY не шлют сигналы, сбрасывающие кеш ответов
+        invalidate(*sorted({
+            group for _, model in CSV_FILES
+            for group in CACHE_GROUPS.get(model, ())
+        }))
+
+    def delete_loaded(self, error, loaded, options):
+        """Удаляет строки частей, не теряя исходную ошибку загрузки."""
+        try:
+            delete_loaded(loaded, options)
+        except Exception as cleanup_error:
+            raise CommandError(
+                f'{error}\nRows of committed chunks were not deleted: '
+                f'{cleanup_error}'
+            ) from error
+
+    def load_wave(self, wave, options, pool=None, loaded=None):
+        if pool is None:
+            for csv_file, _ in wave:
+                started = time.monotonic()
+                self.report(csv_file, load_file(csv_file, options), started)
+            return
+        started = time.monotonic()
+        task_options = {
+            key: options[key] for key in ('path', 'engine', 'batch_size')
+        }
+        futures = []
+        for csv_file, _ in wave:
+            path = os.path.join(options['path'], csv_file)
+            futures += [
+                (csv_file, byte_range, pool.submit(
+                    load_file, csv_file, task_options, byte_range
+                ))
+                for byte_range in get_ranges(path, get_chunks(path, options))
+            ]
+        rows = dict.fromkeys((csv_file for csv_file, _ in wave), 0)
+        errors = []
+        for csv_file, byte_range, future in futures:
+            try:
+                rows[csv_file] += future.result()
+            except CommandError as error:
+                errors.append(str(error))
+            except Exception as error:
+                errors.append(f'{csv_file}: {error}')
+            else:
+                loaded.append((csv_file, byte_range))
+        if errors:
+            raise CommandError('\n'.join(errors))
+        for csv_file, count in rows.items():
+            self.report(csv_file, count, started)
+
+    def report(self, csv_file, rows, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{csv_file}: {rows} rows in {elapsed:.2f}s '
+            f'({rows / elapsed:.0f} rows/sec)'
+        )
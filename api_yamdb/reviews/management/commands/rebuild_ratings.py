@@ -0,0 +1,62 @@
+from api.cache import invalidate
+from api.signals import CACHE_GROUPS
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Count, Sum
+from reviews.models import Review, Title, TitleScore
+
+
+def find_mismatches():
+    """Id произведений, у которых рейтинг или гистограмма разошлись."""
+    expected = {
+        row['title_id']: (row['total'], row['number'])
+        for row in Review.objects.order_by().values('title_id').annotate(
+            total=Sum('score'), number=Count('pk')
+        )
+    }
+    mismatches = {
+        pk for pk, total, number in Title.objects.values_list(
+            'pk', 'rating_sum', 'rating_count'
+        ) if expected.get(pk, (0, 0)) != (total, number)
+    }
+    counted = {
+        (row['title_id'], row['score']): row['count']
+        for row in TitleScore.objects.counted()
+    }
+    stored = {
+        (title_id, score): count
+        for title_id, score, count in TitleScore.objects.filter(
+            count__gt=0
+        ).values_list('title_id', 'score', 'count')
+    }
+    mismatches.update(
+        title_id for (title_id, score), count
+        in set(counted.items()) ^ set(stored.items())
+    )
+    return mismatches
+
+
+class Command(BaseCommand):
+    help = 'Recalculate stored title ratings and score histograms from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report titles whose stored values differ from reviews'
+        )
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatches = find_mismatches()
+            if mismatches:
+                raise CommandError(
+                    'Stored ratings differ from reviews for titles: '
+                    + ', '.join(map(str, sorted(mismatches)))
+                )
+            self.stdout.write('Stored ratings match reviews')
+            return
+        updated = Title.objects.rebuild_rating()
+        self.stdout.write(f'Updated ratings of {updated} titles')
+        rows = TitleScore.objects.rebuild()
+        self.stdout.write(f'Stored {rows} histogram rows')
+        # update() и bulk_create не шлют сигналы, сбрасывающие кеш ответов
+        invalidate(*CACHE_GROUPS[Title])
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management import BaseCommand
+from reviews.rankings import SIZE, TRENDING_DAYS, refresh_rankings
+
+
+class Command(BaseCommand):
+    help = 'Recalculate top rated and trending titles per genre and category'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=SIZE,
+            help='Number of titles kept in every ranking'
+        )
+        parser.add_argument(
+            '--days', type=int, default=TRENDING_DAYS,
+            help='Count reviews of the last days for trending titles'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep refreshing instead of exiting after one pass'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=300,
+            help='Seconds to sleep between refreshes in --loop mode'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rows = refresh_rankings(options['size'], options['days'])
+            self.stdout.write(f'Stored {rows} ranking rows')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
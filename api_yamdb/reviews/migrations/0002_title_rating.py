@@ -0,0 +1,50 @@
+# Generated by Django 3.2 on 2026-10-18 16:39
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, NullIf
+
+
+def fill_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    rating_sum = Coalesce(
+        Subquery(reviews.annotate(total=Sum('score')).values('total')), 0
+    )
+    rating_count = Coalesce(
+        Subquery(reviews.annotate(total=Count('pk')).values('total')), 0
+    )
+    Title.objects.update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=rating_sum / NullIf(rating_count, 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating, migrations.RunPython.noop),
+    ]
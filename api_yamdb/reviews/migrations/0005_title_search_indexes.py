@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 17:20
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+
+SEARCH_INDEXES = (
+    GinIndex(
+        SearchVector('name', 'description', config='russian'),
+        name='title_search_idx'
+    ),
+    GinIndex(
+        fields=['name'],
+        name='title_name_trgm_idx',
+        opclasses=['gin_trgm_ops']
+    ),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    Title = apps.get_model('reviews', 'Title')
+    for index in SEARCH_INDEXES:
+        schema_editor.add_index(Title, index)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Title = apps.get_model('reviews', 'Title')
+    for index in SEARCH_INDEXES:
+        schema_editor.remove_index(Title, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
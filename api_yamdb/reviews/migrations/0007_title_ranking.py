@@ -0,0 +1,52 @@
+# Generated by Django 3.2 on 2026-10-18 16:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_exact_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('top', 'Лучшие'), ('trending', 'Обсуждаемые')], max_length=16, verbose_name='Рейтинг')),
+                ('position', models.PositiveSmallIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Значение')),
+                ('refreshed', models.DateTimeField(verbose_name='Дата расчёта')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинги',
+                'ordering': ['kind', 'position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['pub_date'], name='review_pub_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='genre',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.genre', verbose_name='Жанр'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['kind', 'genre', 'category', 'position'], name='titleranking_scope_idx'),
+        ),
+    ]
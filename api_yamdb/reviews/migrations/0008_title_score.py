@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-18 17:02
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_scores(apps, schema_editor):
+    TitleScore = apps.get_model('reviews', 'TitleScore')
+    Review = apps.get_model('reviews', 'Review')
+    TitleScore.objects.bulk_create(
+        (
+            TitleScore(**row) for row in Review.objects.order_by().values(
+                'title_id', 'score'
+            ).annotate(count=Count('pk'))
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_ranking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Оценки произведения',
+                'verbose_name_plural': 'Гистограммы оценок',
+                'ordering': ['title', 'score'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='titlescore',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_scores, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,18 @@
 from django.conf import settings
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVector, TrigramSimilarity)
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     validate_slug)
-from django.db import models
+from django.db import connections, models, transaction
+from django.db.models import (Case, Count, F, IntegerField, OuterRef, Q,
+                              Subquery, Sum, When)
+from django.db.models.functions import Coalesce, NullIf
 from users.models import User
 
 from .validators import validate_year
 
+SEARCH_CONFIG = 'russian'
+
 
 class GenreCategoryModel(models.Model):
     slug = models.SlugField(
@@ -41,6 +48,71 @@ class Genre(GenreCategoryModel):
         default_related_name = 'genres'
 
 
+class TitleQuerySet(models.QuerySet):
+    def with_related(self):
+        return self.select_related('category').prefetch_related('genre')
+
+    def search(self, text):
+        if connections[self.db].vendor != 'postgresql':
+            return self._search_in_python(text)
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+        return self.annotate(
+            document=SearchVector('name', 'description', config=SEARCH_CONFIG),
+            rank=SearchRank(F('document'), query)
+            + TrigramSimilarity('name', text),
+        ).filter(
+            Q(document=query) | Q(name__trigram_similar=text)
+        ).order_by('-rank', '-id')
+
+    def _search_in_python(self, text):
+        words = text.lower().split()
+        ranks = []
+        for pk, name, description in self.values_list(
+            'pk', 'name', 'description'
+        ):
+            name, description = name.lower(), description.lower()
+            rank = sum(
+                2 * name.count(word) + description.count(word)
+                for word in words
+            )
+            if rank:
+                ranks.append((-rank, -pk))
+        ids = [-pk for _, pk in sorted(ranks)]
+        if not ids:
+            return self.none()
+        return self.filter(pk__in=ids).order_by(Case(
+            *(When(pk=pk, then=position) for position, pk in enumerate(ids)),
+            output_field=IntegerField()
+        ))
+
+    def update_rating(self, score_delta, count_delta):
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_sum / NullIf(rating_count, 0),
+        )
+
+    def rebuild_rating(self):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        rating_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0
+        )
+        rating_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')),
+            0
+        )
+        return self.update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=rating_sum / NullIf(rating_count, 0),
+        )
+
+
 class Title(models.Model):
     name = models.CharField(
         'Название',
@@ -66,11 +138,35 @@ class Title(models.Model):
         Genre,
         through='GenreTitle'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.PositiveSmallIntegerField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     def __str__(self):
         return self.name
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            )
+        ]
         ordering = ['-id']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
@@ -98,6 +194,12 @@ class GenreTitle(models.Model):
                 name='unique_title_genre'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['genre', 'title'],
+                name='genretitle_genre_title_idx'
+            )
+        ]
         ordering = ['title']
         verbose_name = 'Жанр произведения'
         verbose_name_plural = 'Жанры произведений'
@@ -120,6 +222,20 @@ class Review(models.Model):
     score = models.IntegerField('Оценка', validators=[MinValueValidator(1),
                                 MaxValueValidator(10)])
     pub_date = models.DateTimeField('Дата', auto_now_add=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if 'title_id' in loaded and 'score' in loaded:
+            instance._rated = (loaded['title_id'], loaded['score'])
+        return instance
+
+    @property
+    def is_rated(self):
+        """Учтена ли оценка в рейтинге произведения."""
+        return getattr(self, '_rated', None) is not None
 
     def __str__(self):
         return f'{self.author}-{self.title}'
@@ -131,6 +247,13 @@ class Review(models.Model):
                 name='unique_title_author'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(fields=['pub_date'], name='review_pub_date_idx'),
+        ]
         ordering = ['-pub_date']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
@@ -151,8 +274,155 @@ class Comment(models.Model):
         verbose_name='Автор'
     )
     pub_date = models.DateTimeField('Дата', auto_now_add=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            )
+        ]
         ordering = ['author']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class TitleScoreQuerySet(models.QuerySet):
+    def add(self, title_id, score, delta):
+        """Меняет число оценок score у произведения, создавая строку."""
+        scores = self.filter(title_id=title_id, score=score)
+        if scores.update(count=F('count') + delta) or delta < 0:
+            return
+        self.bulk_create(
+            [TitleScore(title_id=title_id, score=score, count=0)],
+            ignore_conflicts=True
+        )
+        scores.update(count=F('count') + delta)
+
+    def counted(self, title_ids=None):
+        """Гистограммы, посчитанные заново по отзывам."""
+        reviews = Review.objects.order_by()
+        if title_ids is not None:
+            reviews = reviews.filter(title_id__in=title_ids)
+        return reviews.values('title_id', 'score').annotate(count=Count('pk'))
+
+    def rebuild(self, title_ids=None):
+        """Перезаписывает гистограммы произведений (или всех) по отзывам."""
+        scores = self.all()
+        if title_ids is not None:
+            scores = scores.filter(title_id__in=title_ids)
+        rows = [TitleScore(**row) for row in self.counted(title_ids)]
+        with transaction.atomic():
+            scores.delete()
+            self.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+    def stats(self):
+        """Число оценок, среднее, медиана и гистограмма 1–10."""
+        histogram = dict.fromkeys(range(1, 11), 0)
+        histogram.update(self.values_list('score', 'count'))
+        count = sum(histogram.values())
+        if not count:
+            return {
+                'count': 0, 'mean': None, 'median': None,
+                'histogram': histogram,
+            }
+        middle = []
+        seen = 0
+        for score, number in histogram.items():
+            middle.extend(
+                score for position in {(count - 1) // 2, count // 2}
+                if seen <= position < seen + number
+            )
+            seen += number
+        return {
+            'count': count,
+            'mean': round(sum(
+                score * number for score, number in histogram.items()
+            ) / count, 2),
+            'median': sum(middle) / len(middle),
+            'histogram': histogram,
+        }
+
+
+class TitleScore(models.Model):
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='scores',
+        verbose_name='Произведение'
+    )
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество', default=0)
+
+    objects = TitleScoreQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score'
+            )
+        ]
+        ordering = ['title', 'score']
+        verbose_name = 'Оценки произведения'
+        verbose_name_plural = 'Гистограммы оценок'
+
+
+class TitleRanking(models.Model):
+    """Предрассчитанные первые места по жанрам и категориям.
+
+    Строки без жанра и категории — общий рейтинг. Заполняется
+    командой refresh_rankings.
+    """
+    TOP = 'top'
+    TRENDING = 'trending'
+    KINDS = (
+        (TOP, 'Лучшие'),
+        (TRENDING, 'Обсуждаемые'),
+    )
+
+    kind = models.CharField('Рейтинг', max_length=16, choices=KINDS)
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Жанр',
+        null=True,
+        blank=True
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Категория',
+        null=True,
+        blank=True
+    )
+    position = models.PositiveSmallIntegerField('Место')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение'
+    )
+    score = models.FloatField('Значение')
+    refreshed = models.DateTimeField('Дата расчёта')
+
+    def __str__(self):
+        return f'{self.kind} {self.position}: {self.title_id}'
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['kind', 'genre', 'category', 'position'],
+                name='titleranking_scope_idx'
+            )
+        ]
+        ordering = ['kind', 'position']
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинги'
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Category, Genre, Review, Title, TitleRanking
+
+SIZE = 10
+TRENDING_DAYS = 7
+
+
+def get_scopes():
+    yield {}
+    for genre in Genre.objects.all():
+        yield {'genre': genre}
+    for category in Category.objects.all():
+        yield {'category': category}
+
+
+def top(scope, size):
+    return Title.objects.filter(
+        rating__isnull=False, **scope
+    ).order_by('-rating', '-rating_count', '-id').values_list(
+        'pk', 'rating'
+    )[:size]
+
+
+def trending(scope, size, since):
+    return Review.objects.filter(
+        pub_date__gte=since,
+        **{f'title__{field}': value for field, value in scope.items()}
+    ).order_by().values('title').annotate(
+        total=Count('pk')
+    ).order_by('-total', '-title').values_list('title', 'total')[:size]
+
+
+def refresh_rankings(size=SIZE, days=TRENDING_DAYS):
+    """Пересчитывает таблицу рейтингов целиком и возвращает число строк.
+
+    На каждый жанр и категорию уходит по запросу с LIMIT size, читающие
+    запросы до коммита видят прежнюю версию таблицы.
+    """
+    now = timezone.now()
+    since = now - timedelta(days=days)
+    rankings = []
+    for scope in get_scopes():
+        for kind, rows in (
+            (TitleRanking.TOP, top(scope, size)),
+            (TitleRanking.TRENDING, trending(scope, size, since)),
+        ):
+            rankings.extend(
+                TitleRanking(
+                    kind=kind, position=position, title_id=title_id,
+                    score=score, refreshed=now, **scope
+                )
+                for position, (title_id, score) in enumerate(rows, 1)
+            )
+    with transaction.atomic():
+        TitleRanking.objects.all().delete()
+        TitleRanking.objects.bulk_create(rankings, batch_size=1000)
+    return len(rankings)
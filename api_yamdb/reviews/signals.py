@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Review, Title, TitleScore
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating(sender, instance, created, **kwargs):
+    rated = getattr(instance, '_rated', None)
+    if created:
+        # Без произведения UPDATE не находит строку, и отзыв остаётся
+        # неучтённым (is_rated): ответ на это выбирает вызывающий код.
+        if not Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score, 1
+        ):
+            return
+        TitleScore.objects.add(instance.title_id, instance.score, 1)
+    elif rated is None:
+        Title.objects.filter(pk=instance.title_id).rebuild_rating()
+        TitleScore.objects.rebuild([instance.title_id])
+    elif rated[0] != instance.title_id:
+        Title.objects.filter(pk=rated[0]).update_rating(-rated[1], -1)
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score, 1
+        )
+        TitleScore.objects.add(*rated, -1)
+        TitleScore.objects.add(instance.title_id, instance.score, 1)
+    elif rated[1] != instance.score:
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            instance.score - rated[1], 0
+        )
+        TitleScore.objects.add(*rated, -1)
+        TitleScore.objects.add(instance.title_id, instance.score, 1)
+    instance._rated = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def remove_title_rating(sender, instance, **kwargs):
+    title_id, score = getattr(
+        instance, '_rated', (instance.title_id, instance.score)
+    )
+    Title.objects.filter(pk=title_id).update_rating(-score, -1)
+    TitleScore.objects.add(title_id, score, -1)
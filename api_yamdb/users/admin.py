@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import OutgoingEmail, User
 
 
 @admin.register(User)
@@ -9,3 +9,11 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ('name',)
     list_filter = ('role',)
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'to', 'subject', 'created', 'attempts', 'sent')
+    search_fields = ('to',)
+    list_filter = ('sent',)
+    empty_value_display = '-пусто-'
@@ -0,0 +1,100 @@
+import time
+from datetime import timedelta
+
+from django.core.mail import get_connection
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from users.models import OutgoingEmail
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+BACKOFF = 60
+
+
+def fail(email, error, now, backoff):
+    email.last_error = str(error)
+    email.send_after = now + timedelta(
+        seconds=backoff * 2 ** (email.attempts - 1)
+    )
+
+
+def send_batch(batch_size, max_attempts, backoff):
+    """Отправляет пачку писем; ошибки отправки откладывают письма.
+
+    Если не удалось открыть соединение, попытка засчитывается всей
+    пачке, чтобы воркер не падал и не повторял её без паузы.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(OutgoingEmail.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            sent__isnull=True, attempts__lt=max_attempts, send_after__lte=now
+        )[:batch_size])
+        if not emails:
+            return 0, 0
+        for email in emails:
+            email.attempts += 1
+        failed = 0
+        connection = get_connection()
+        try:
+            connection.open()
+        except Exception as error:
+            for email in emails:
+                fail(email, error, now, backoff)
+            failed = len(emails)
+        else:
+            try:
+                for email in emails:
+                    try:
+                        connection.send_messages(
+                            [email.as_message(connection)]
+                        )
+                    except Exception as error:
+                        failed += 1
+                        fail(email, error, now, backoff)
+                    else:
+                        email.sent = now
+            finally:
+                connection.close()
+        OutgoingEmail.objects.bulk_update(
+            emails, ('attempts', 'last_error', 'send_after', 'sent')
+        )
+    return len(emails) - failed, failed
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails in batches over a single mail connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--max-attempts', type=int, default=MAX_ATTEMPTS,
+            help='Stop retrying an email after this many failures'
+        )
+        parser.add_argument(
+            '--backoff', type=int, default=BACKOFF,
+            help='Seconds before the first retry, doubled on each failure'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the queue instead of exiting when it is empty'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep between polls in --loop mode'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_batch(
+                options['batch_size'], options['max_attempts'],
+                options['backoff']
+            )
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
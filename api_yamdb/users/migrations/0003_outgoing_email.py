@@ -0,0 +1,38 @@
+# Generated by Django 3.2 on 2026-10-18 16:49
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_alter_user_username'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutgoingEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=256, verbose_name='Тема')),
+                ('body', models.TextField(verbose_name='Текст')),
+                ('from_email', models.EmailField(max_length=254, verbose_name='Отправитель')),
+                ('to', models.EmailField(max_length=254, verbose_name='Получатель')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('send_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Отправить после')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попытки')),
+                ('sent', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Письмо',
+                'verbose_name_plural': 'Очередь писем',
+                'ordering': ['send_after'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outgoingemail',
+            index=models.Index(condition=models.Q(sent__isnull=True), fields=['send_after'], name='outgoing_email_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2 on 2026-10-18 17:26
+
+from django.db import migrations, models
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.ClaimsUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='claims_version',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Версия прав в токенах'),
+        ),
+    ]
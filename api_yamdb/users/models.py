@@ -1,10 +1,41 @@
 
 from django.conf import settings
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 
 from .validators import validate_username
 
+CLAIMS_CACHE_KEY = 'user-claims:{user_id}'
+# Поля, копии которых лежат в JWT; их смена отзывает выданные токены
+CLAIM_FIELDS = ('username', 'role', 'is_superuser', 'is_active')
+
+
+def forget_claims(user_ids):
+    keys = [CLAIMS_CACHE_KEY.format(user_id=user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class UserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """При смене ролей, имени или блокировке увеличивает claims_version."""
+        if not set(kwargs) & set(CLAIM_FIELDS):
+            return super().update(**kwargs)
+        user_ids = list(self.values_list('pk', flat=True))
+        kwargs.setdefault('claims_version', F('claims_version') + 1)
+        try:
+            return super().update(**kwargs)
+        finally:
+            forget_claims(user_ids)
+
+
+class ClaimsUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
 
 class User(AbstractUser):
 
@@ -53,10 +84,55 @@ class User(AbstractUser):
         max_length=settings.LENG_SLUG,
         default=USER,
     )
+    claims_version = models.PositiveIntegerField(
+        'Версия прав в токенах',
+        default=0,
+        editable=False,
+    )
+
+    objects = ClaimsUserManager()
 
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_claims()
+        return instance
+
+    def remember_claims(self):
+        self._saved_claims = {
+            field: self.__dict__[field] for field in CLAIM_FIELDS
+            if field in self.__dict__
+        }
+
+    def claims_changed(self):
+        if self._state.adding:
+            return False
+        saved = getattr(self, '_saved_claims', {})
+        return any(
+            field not in saved or saved[field] != self.__dict__[field]
+            for field in CLAIM_FIELDS if field in self.__dict__
+        )
+
+    def save(self, *args, **kwargs):
+        """Отзывает токены, если изменилось поле из CLAIM_FIELDS.
+
+        Сравнение идёт со значениями, прочитанными из БД, без запроса.
+        """
+        changed = self.claims_changed()
+        if changed:
+            self.claims_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {
+                    *kwargs['update_fields'], 'claims_version'
+                }
+        super().save(*args, **kwargs)
+        self.remember_claims()
+        if changed:
+            forget_claims([self.pk])
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN
@@ -69,3 +145,48 @@ class User(AbstractUser):
         ordering = ["id"]
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+
+
+class OutgoingEmail(models.Model):
+    subject = models.CharField(
+        'Тема',
+        max_length=settings.LENG_MAX
+    )
+    body = models.TextField('Текст')
+    from_email = models.EmailField(
+        'Отправитель',
+        max_length=settings.LENG_EMAIL
+    )
+    to = models.EmailField(
+        'Получатель',
+        max_length=settings.LENG_EMAIL
+    )
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField(
+        'Отправить после',
+        default=timezone.now
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=0)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    def __str__(self):
+        return f'{self.to}: {self.subject}'
+
+    def as_message(self, connection):
+        return EmailMessage(
+            self.subject, self.body, self.from_email, [self.to],
+            connection=connection
+        )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['send_after'],
+                name='outgoing_email_pending_idx',
+                condition=Q(sent__isnull=True)
+            )
+        ]
+        ordering = ['send_after']
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Очередь писем'
@@ -0,0 +1,96 @@
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def another_user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUserAnother', email='testuseranother@yamdb.fake',
+        password='1234567'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake',
+        password='1234567', role='admin'
+    )
+
+
+def get_client(user):
+    from rest_framework.test import APIClient
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return client
+
+
+@pytest.fixture
+def user_client(user):
+    return get_client(user)
+
+
+@pytest.fixture
+def admin_client(admin):
+    return get_client(admin)
+
+
+@pytest.fixture
+def category():
+    from reviews.models import Category
+    return Category.objects.create(name='Фильм', slug='films')
+
+
+@pytest.fixture
+def genre():
+    from reviews.models import Genre
+    return Genre.objects.create(name='Драма', slug='drama')
+
+
+@pytest.fixture
+def title(category, genre):
+    from reviews.models import Title
+    title = Title.objects.create(
+        name='Титаник', year=1997, category=category
+    )
+    title.genre.add(genre)
+    return title
+
+
+@pytest.fixture
+def assert_queries_do_not_grow():
+    """Сравнивает число запросов к эндпоинту на неполной и полной странице."""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def check(client, url, add_rows, page_size=5):
+        add_rows(1)
+        with CaptureQueriesContext(connection) as small:
+            response = client.get(url)
+        assert response.status_code == 200, response.content
+        add_rows(page_size - 1)
+        with CaptureQueriesContext(connection) as full:
+            response = client.get(url)
+        assert response.status_code == 200, response.content
+        assert len(full) == len(small), (
+            f'Число запросов к {url} растёт вместе с размером страницы: '
+            f'{len(small)} -> {len(full)}\n'
+            + '\n'.join(query['sql'] for query in full.captured_queries)
+        )
+        return len(full)
+
+    return check
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+    cache.clear()
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from api.async_views import ASGIHandler, ThreadedStream, async_read_view
+from api.middleware import TimingMiddleware
+from api.views import TitleViewSet
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.test import AsyncRequestFactory
+from reviews.models import Title
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncViews:
+
+    def test_read_runs_in_thread_pool(self, title):
+        view = async_read_view(TitleViewSet.as_view({'get': 'retrieve'}))
+        request = AsyncRequestFactory().get(f'/api/v1/titles/{title.pk}/')
+        response = async_to_sync(view)(request, pk=title.pk)
+        assert response.status_code == 200
+        assert response.is_rendered
+        assert response.data['name'] == title.name
+
+    def test_middleware_counts_pool_queries(self, title):
+        view = async_read_view(TitleViewSet.as_view({'get': 'retrieve'}))
+
+        async def get_response(request):
+            return await view(request, pk=title.pk)
+
+        middleware = TimingMiddleware(get_response)
+        request = AsyncRequestFactory().get(f'/api/v1/titles/{title.pk}/')
+        response = async_to_sync(middleware)(request)
+        assert response.status_code == 200
+        assert 'desc="0 queries"' not in response['Server-Timing']
+
+    def test_middleware_counts_sync_view_queries(self, title):
+        view = TitleViewSet.as_view({'get': 'retrieve'})
+
+        def get_queries(get_response):
+            cache.clear()
+            middleware = TimingMiddleware(get_response)
+            request = AsyncRequestFactory().get(f'/api/v1/titles/{title.pk}/')
+            response = async_to_sync(middleware)(request)
+            assert response.status_code == 200
+            return response['Server-Timing'].split(';')[2]
+
+        sync_view = sync_to_async(view)
+        async_view = async_read_view(view)
+
+        async def run_sync(request):
+            response = await sync_view(request, pk=title.pk)
+            await sync_to_async(response.render)()
+            return response
+
+        async def run_async(request):
+            return await async_view(request, pk=title.pk)
+
+        queries = get_queries(run_sync)
+        assert queries != 'desc="0 queries", serialize'
+        assert get_queries(run_async) == queries, (
+            'Проверьте, что запросы async-view не считаются дважды'
+        )
+
+    def test_streamed_list_under_asgi(self, settings, title):
+        settings.STREAM_CHUNK_SIZE = 1
+        Title.objects.create(name='Ещё', year=2000)
+        view = async_read_view(TitleViewSet.as_view({'get': 'list'}))
+        middleware = TimingMiddleware(view)
+        request = AsyncRequestFactory().get('/api/v1/titles/', {
+            'page_size': 5
+        })
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        async def serve():
+            response = await middleware(request)
+            assert response.streaming
+            queries = request.query_timer.count
+            await ASGIHandler().send_response(response, send)
+            return queries
+
+        queries = async_to_sync(serve)()
+        body = b''.join(message.get('body', b'') for message in messages[1:])
+        assert len(json.loads(body)['results']) == 2
+        assert messages[-1] == {'type': 'http.response.body'}
+        assert request.query_timer.count > queries, (
+            'Проверьте, что запросы при отдаче потока попадают в метрики'
+        )
+
+    def test_stream_stops_reading_when_closed(self):
+        closed = []
+
+        def content():
+            try:
+                for number in range(100):
+                    yield str(number).encode()
+            finally:
+                closed.append(True)
+
+        async def read_one():
+            stream = ThreadedStream(content())
+            async for chunk in stream:
+                break
+            await stream.aclose()
+            return chunk
+
+        assert async_to_sync(read_one)() == b'0'
+        assert closed == [True]
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestClaimsAuthentication:
+
+    def get_token(self, user):
+        from django.contrib.auth.tokens import default_token_generator
+
+        response = APIClient().post('/api/v1/auth/token/', {
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == 200
+        return response.json()['token']
+
+    def get_client(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_admin_request_reads_only_claims(self, admin):
+        client = self.get_client(self.get_token(admin))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/users/')
+
+        assert response.status_code == 200
+        assert response.json()['count'] == 1
+        assert len(queries) == 3
+        assert 'password' not in queries.captured_queries[0]['sql']
+        assert 'claims_version' in queries.captured_queries[0]['sql']
+
+    def test_shared_cache_skips_claims_query(self, admin, monkeypatch,
+                                             django_assert_num_queries):
+        from api import authentication
+        monkeypatch.setattr(authentication, 'LOCAL_CACHES', ())
+        client = self.get_client(self.get_token(admin))
+        assert client.get('/api/v1/users/').status_code == 200
+
+        with django_assert_num_queries(2):
+            assert client.get('/api/v1/users/').status_code == 200
+
+        User.objects.filter(pk=admin.pk).update(role='user')
+        assert client.get('/api/v1/users/').status_code == 403
+
+    def test_me_loads_profile(self, user):
+        client = self.get_client(self.get_token(user))
+
+        response = client.get('/api/v1/users/me/')
+
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email
+
+    def test_role_change_revokes_claims(self, admin, user):
+        client = self.get_client(self.get_token(admin))
+        assert client.get('/api/v1/users/').status_code == 200
+
+        admin.role = 'user'
+        admin.save()
+
+        assert client.get('/api/v1/users/').status_code == 403
+
+    def test_update_and_block_revoke_claims(self, admin, user):
+        admin_client = self.get_client(self.get_token(admin))
+        user_client = self.get_client(self.get_token(user))
+
+        User.objects.filter(pk=admin.pk).update(role='user')
+        user.is_active = False
+        user.save(update_fields=['is_active'])
+
+        assert admin_client.get('/api/v1/users/').status_code == 403
+        assert user_client.get('/api/v1/users/me/').status_code == 401
+
+    def test_rename_refreshes_username(self, user, title):
+        client = self.get_client(self.get_token(user))
+
+        User.objects.filter(pk=user.pk).update(username='renamed')
+
+        response = client.post(
+            f'/api/v1/titles/{title.pk}/reviews/', {'text': 'Да', 'score': 5}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == 'renamed'
+
+    def test_other_changes_keep_tokens(self, user):
+        client = self.get_client(self.get_token(user))
+
+        user.bio = 'Новая биография'
+        user.save()
+        User.objects.filter(pk=user.pk).update(first_name='Иван')
+
+        user.refresh_from_db()
+        assert user.claims_version == 0
+        assert client.get('/api/v1/users/me/').status_code == 200
+
+    def test_update_keeps_explicit_claims_version(self, user):
+        User.objects.filter(pk=user.pk).update(role='admin', claims_version=5)
+
+        user.refresh_from_db()
+        assert (user.role, user.claims_version) == ('admin', 5)
@@ -0,0 +1,74 @@
+import json
+import os
+
+import pytest
+from api.benchmark import (SCENARIOS, DjangoTarget, compare,
+                           compare_serializers, generate_dataset, run)
+from api.cache import stats as cache_stats
+from django.core.management import CommandError, call_command
+from reviews.models import Review, Title, TitleScore
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'benchmarks', 'baseline.json')
+
+
+@pytest.mark.django_db
+class TestBenchmarks:
+
+    def test_generate_dataset(self):
+        rows = generate_dataset(
+            titles=4, genres=2, categories=2, users=3, reviews=2, comments=1
+        )
+        assert rows['Title'] == 4
+        assert rows['Review'] == 8
+        assert rows['Comment'] == 8
+        assert Review.objects.count() == 8
+        assert all(title.rating for title in Title.objects.all())
+        assert all(
+            TitleScore.objects.filter(title=title).stats()['count'] == 2
+            for title in Title.objects.all()
+        )
+
+    def test_queries_within_baseline(self):
+        generate_dataset(
+            titles=6, genres=2, categories=2, users=6, reviews=6, comments=6
+        )
+        results = run(DjangoTarget(), SCENARIOS, requests=3)
+        with open(BASELINE, encoding='utf8') as f:
+            assert compare(results, json.load(f), tolerance=0) == []
+        assert set(results['title_list']) >= {
+            'p50_ms', 'p95_ms', 'p99_ms', 'requests_per_sec'
+        }
+
+    def test_cached_scenarios_miss_cache(self):
+        generate_dataset(
+            titles=12, genres=2, categories=2, users=3, reviews=1, comments=1
+        )
+        hits = cache_stats['titles', 'hit']
+        run(DjangoTarget(), ('title_list', 'title_detail'), requests=4)
+        assert cache_stats['titles', 'hit'] == hits, (
+            'Проверьте, что бенчмарк не измеряет ответы из кеша'
+        )
+
+    def test_command_reports_regressions(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        baseline.write_text(json.dumps(
+            {'title_detail': {'queries_per_request': 0}}
+        ))
+        output = tmp_path / 'results.json'
+        with pytest.raises(CommandError, match='title_detail: queries'):
+            call_command(
+                'benchmark', 'title_detail', '--generate', '--titles', '2',
+                '--requests', '2', '--output', str(output),
+                '--baseline', str(baseline)
+            )
+        assert 'title_detail' in json.loads(output.read_text())
+
+    def test_compare_serializers(self):
+        generate_dataset(
+            titles=3, genres=2, categories=2, users=2, reviews=2, comments=1
+        )
+        results = compare_serializers(rows=4, repeat=1)
+        assert results['titles']['rows'] == 3
+        assert results['reviews']['rows'] == 4
+        assert all(result['identical'] for result in results.values())
+        assert all(result['fast_ms'] > 0 for result in results.values())
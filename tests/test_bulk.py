@@ -0,0 +1,118 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Category, Genre, Title
+
+
+def title_items(size):
+    return [
+        {'name': f'Фильм {number}', 'year': 2000, 'category': 'films',
+         'genre': ['drama', 'comedy']}
+        for number in range(size)
+    ]
+
+
+@pytest.mark.django_db
+class TestBulk:
+
+    def test_admin_only(self, user_client):
+        response = user_client.post('/api/v1/genres/bulk/', [], format='json')
+        assert response.status_code == 403
+
+    def test_create_genres(self, admin_client, genre):
+        response = admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Комедия', 'slug': 'comedy'},
+            {'name': 'Драма', 'slug': 'drama'},
+            {'name': 'Без slug'},
+        ], format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [
+            201, 400, 400
+        ]
+        assert set(Genre.objects.values_list('slug', flat=True)) == {
+            'comedy', 'drama'
+        }
+
+    def test_create_titles(self, admin_client, category, genre):
+        Genre.objects.create(name='Комедия', slug='comedy')
+        items = title_items(20)
+        items.append({'name': 'Ошибка', 'year': 2000, 'category': 'nope',
+                      'genre': ['drama']})
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', items, format='json'
+        )
+        assert response.status_code == 207
+        results = response.json()
+        assert results[0]['status'] == 201
+        assert results[0]['data']['genre'] == ['drama', 'comedy']
+        assert 'category' in results[-1]['errors']
+        assert Title.objects.count() == 20
+        title = Title.objects.get(pk=results[0]['data']['id'])
+        assert set(title.genre.values_list('slug', flat=True)) == {
+            'drama', 'comedy'
+        }
+
+    @pytest.mark.skipif(
+        not connection.features.can_return_rows_from_bulk_insert,
+        reason='без RETURNING произведения сохраняются по одному'
+    )
+    @pytest.mark.parametrize('size', (2, 50))
+    def test_create_titles_queries(self, admin_client, category, genre,
+                                   size):
+        Genre.objects.create(name='Комедия', slug='comedy')
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                '/api/v1/titles/bulk/', title_items(size), format='json'
+            )
+        assert response.status_code == 201
+        assert len(queries) <= 8, (
+            'Проверьте, что число запросов не зависит от числа объектов'
+        )
+
+    def test_create_titles_ndjson(self, admin_client, category, genre):
+        body = '\n'.join(json.dumps(
+            {'name': name, 'year': 2000, 'category': 'films',
+             'genre': ['drama']}
+        ) for name in ('Первый', 'Второй'))
+        response = admin_client.post(
+            '/api/v1/titles/bulk/', body,
+            content_type='application/x-ndjson'
+        )
+        assert response.status_code == 201
+        assert Title.objects.count() == 2
+
+    def test_update_titles(self, admin_client, title):
+        other = Category.objects.create(name='Книга', slug='books')
+        response = admin_client.patch('/api/v1/titles/bulk/', [
+            {'id': title.pk, 'name': 'Новое', 'category': 'books'},
+            {'id': 0, 'name': 'Нет такого'},
+            {'name': 'Без id'},
+        ], format='json')
+        assert response.status_code == 207
+        assert [item['status'] for item in response.json()] == [
+            200, 404, 400
+        ]
+        assert response.json()[0]['data']['genre'] == ['drama']
+        title.refresh_from_db()
+        assert (title.name, title.category) == ('Новое', other)
+
+    def test_delete(self, admin_client, title, category):
+        response = admin_client.delete(
+            '/api/v1/titles/bulk/', [title.pk, 0], format='json'
+        )
+        assert [item['status'] for item in response.json()] == [204, 404]
+        assert not Title.objects.exists()
+        response = admin_client.delete(
+            '/api/v1/categories/bulk/', ['films'], format='json'
+        )
+        assert response.status_code == 200
+        assert not Category.objects.exists()
+
+    def test_invalidates_cache(self, admin_client, client, genre):
+        assert len(client.get('/api/v1/genres/').json()['results']) == 1
+        admin_client.post('/api/v1/genres/bulk/', [
+            {'name': 'Комедия', 'slug': 'comedy'},
+        ], format='json')
+        assert len(client.get('/api/v1/genres/').json()['results']) == 2
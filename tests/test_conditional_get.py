@@ -0,0 +1,86 @@
+import pytest
+from reviews.models import Comment, Review
+from users.models import User
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    @pytest.fixture
+    def review(self, title, user):
+        return Review.objects.create(
+            title=title, author=user, text='Текст', score=5
+        )
+
+    def test_reviews_etag(self, client, title, review,
+                          django_assert_max_num_queries):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response['ETag']
+        assert not response.has_header('Last-Modified')
+
+        with django_assert_max_num_queries(2):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        review.text = 'Новый текст'
+        review.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+    @pytest.mark.parametrize('suffix', ('', '{review}/'))
+    def test_etag_changes_on_author_rename(self, client, title, review,
+                                           user, suffix):
+        url = f'/api/v1/titles/{title.pk}/reviews/' + suffix.format(
+            review=review.pk
+        )
+        etag = client.get(url)['ETag']
+
+        User.objects.filter(pk=user.pk).update(username='renamed')
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что ETag меняется при смене имени автора'
+        )
+        data = response.json()
+        assert data.get('results', [data])[0]['author'] == 'renamed'
+
+    def test_review_detail_if_modified_since(self, client, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/'
+        response = client.get(url)
+
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+
+        assert response.status_code == 304
+
+    def test_comments_etag_changes_on_delete(self, client, title, review,
+                                             user):
+        comments = [
+            Comment.objects.create(review=review, author=user, text=text)
+            for text in ('Первый', 'Второй')
+        ]
+        url = f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        etag = client.get(url)['ETag']
+
+        comments[0].delete()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_list_ignores_if_modified_since(self, client, title, review):
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        since = client.get(f'{url}{review.pk}/')['Last-Modified']
+
+        review.delete()
+
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=since
+        ).status_code == 200
+
+    def test_non_numeric_pk(self, client, title, review):
+        assert client.get(
+            f'/api/v1/titles/{title.pk}/reviews/abc/'
+        ).status_code == 404
@@ -0,0 +1,148 @@
+import pytest
+from django.db import OperationalError, connection
+from django.db.utils import load_backend
+from psycopg2 import extensions
+
+from api_yamdb.db import check_connections, is_healthy
+from api_yamdb.db.pooled.base import ConnectionPool
+
+
+class FakeCursor:
+
+    def execute(self, sql):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+
+    def __init__(self, healthy=True):
+        self.checks = 0
+        self.closed = False
+        self.healthy = healthy
+        self.info = type('Info', (), {
+            'transaction_status': extensions.TRANSACTION_STATUS_IDLE
+        })()
+
+    def cursor(self):
+        self.checks += 1
+        if not self.healthy:
+            raise OperationalError('server closed the connection')
+        return FakeCursor()
+
+    def rollback(self):
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+
+    def test_reuses_released_connections(self):
+        pool = ConnectionPool(max_size=2, timeout=0)
+        first = pool.acquire(FakeConnection, health_check=True)
+        pool.release(first)
+        assert pool.acquire(FakeConnection, health_check=True) is first
+
+    def test_rolls_back_open_transactions(self):
+        pool = ConnectionPool(max_size=1, timeout=0)
+        conn = pool.acquire(FakeConnection, health_check=False)
+        conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+        pool.release(conn)
+        assert not conn.closed
+        assert pool.idle == [conn]
+
+    def test_replaces_broken_connections(self):
+        pool = ConnectionPool(max_size=1, timeout=0)
+        broken = pool.acquire(FakeConnection, health_check=True)
+        broken.healthy = False
+        pool.release(broken)
+        fresh = pool.acquire(FakeConnection, health_check=True)
+        assert fresh is not broken
+        assert broken.closed
+
+    def test_exhausted(self):
+        pool = ConnectionPool(max_size=1, timeout=0)
+        pool.acquire(FakeConnection, health_check=False)
+        with pytest.raises(Exception, match='exhausted'):
+            pool.acquire(FakeConnection, health_check=False)
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql', reason='Пул работает с PostgreSQL'
+)
+@pytest.mark.django_db
+def test_pooled_ignores_conn_max_age():
+    settings_dict = dict(connection.settings_dict, CONN_MAX_AGE=60)
+    wrapper = load_backend('api_yamdb.db.pooled').DatabaseWrapper(
+        settings_dict, 'pooled'
+    )
+    wrapper.ensure_connection()
+    raw = wrapper.connection
+    wrapper.close_if_unusable_or_obsolete()
+    assert wrapper.connection is None, (
+        'Проверьте, что соединение возвращается в пул в конце запроса'
+    )
+    wrapper.ensure_connection()
+    assert wrapper.connection is raw
+    wrapper.close()
+
+
+@pytest.fixture
+def wrapper(tmp_path):
+    """Отдельное соединение с тестовой БД через backend проекта."""
+    settings_dict = dict(connection.settings_dict, CONN_HEALTH_CHECKS=True)
+    if connection.vendor == 'sqlite':
+        # SQLite в памяти Django не закрывает, нужен файл
+        engine = 'api_yamdb.db.sqlite3'
+        settings_dict['NAME'] = str(tmp_path / 'health.sqlite3')
+    else:
+        engine = 'api_yamdb.db.postgresql'
+    wrapper = load_backend(engine).DatabaseWrapper(settings_dict, 'health')
+    wrapper.ensure_connection()
+    yield wrapper
+    wrapper.close()
+
+
+def query(wrapper):
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        return cursor.fetchone()
+
+
+@pytest.mark.django_db
+class TestHealthChecks:
+
+    def test_is_healthy(self, wrapper):
+        assert is_healthy(wrapper.connection)
+        wrapper.connection.close()
+        assert not is_healthy(wrapper.connection)
+
+    def test_keeps_healthy_connection(self, wrapper):
+        raw = wrapper.connection
+        wrapper.mark_health_check()
+        assert query(wrapper) == (1,)
+        assert wrapper.connection is raw
+
+    def test_reopens_broken_connection(self, wrapper):
+        raw = wrapper.connection
+        raw.close()
+        wrapper.mark_health_check()
+        assert query(wrapper) == (1,)
+        assert wrapper.connection is not raw
+
+    def test_checks_once_per_request(self, wrapper, monkeypatch):
+        checks = []
+        monkeypatch.setattr(
+            'api_yamdb.db.is_healthy',
+            lambda conn: checks.append(conn) or True
+        )
+        query(wrapper)
+        assert checks == [], 'Проверьте, что без отметки проверки нет'
+        wrapper.mark_health_check()
+        query(wrapper)
+        query(wrapper)
+        assert checks == [wrapper.connection]
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+from .test_load_data import data_dir  # noqa: F401
+
+
+@pytest.mark.django_db
+class TestDumpData:
+
+    def test_round_trip(self, data_dir, tmp_path_factory):  # noqa: F811
+        call_command('load_data', path=data_dir, engine='copy')
+        review = Review.objects.get(pk=1)
+        dump_dir = tmp_path_factory.mktemp('dump')
+
+        call_command('dump_data', path=dump_dir, chunk_size=1)
+        for model in (Comment, Review, Title, Genre, Category, User):
+            model.objects.all().delete()
+        call_command('load_data', path=dump_dir, engine='copy')
+
+        loaded = Review.objects.get(pk=1)
+        assert (loaded.text, loaded.score, loaded.author_id) == (
+            review.text, review.score, review.author_id
+        )
+        assert loaded.pub_date == review.pub_date
+        assert Title.objects.get(pk=2).genre.count() == 2
+
+    def test_export_endpoint(self, admin_client, user_client, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=5)
+
+        response = user_client.get('/api/v1/export/reviews.ndjson')
+        assert response.status_code == 403
+
+        response = admin_client.get('/api/v1/export/reviews.ndjson')
+        assert response.status_code == 200
+        assert response.streaming
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert len(rows) == 1
+        assert rows[0]['title_id'] == title.pk
+        assert rows[0]['text'] == 'Текст'
+
+        response = admin_client.get('/api/v1/export/unknown.csv')
+        assert response.status_code == 404
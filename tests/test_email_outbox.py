@@ -0,0 +1,82 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from users.models import OutgoingEmail
+
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class ClosedBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError('SMTP не отвечает')
+
+    def send_messages(self, email_messages):
+        raise AssertionError('Соединение не открыто')
+
+
+@pytest.mark.django_db
+class TestEmailOutbox:
+
+    def signup(self, client):
+        response = client.post('/api/v1/auth/signup/', {
+            'username': 'new_user', 'email': 'new_user@yamdb.fake'
+        })
+        assert response.status_code == 200
+
+    def test_signup_queues_email(self, client, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+        self.signup(client)
+
+        assert mail.outbox == []
+        email = OutgoingEmail.objects.get()
+        assert email.to == 'new_user@yamdb.fake'
+        assert email.sent is None
+
+    def test_worker_sends_queue(self, client, settings):
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        self.signup(client)
+
+        call_command('send_emails')
+
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['new_user@yamdb.fake']
+        assert OutgoingEmail.objects.get().sent is not None
+
+    def test_failed_email_is_retried_with_backoff(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.FailingBackend'
+        self.signup(client)
+
+        call_command('send_emails', backoff=60)
+
+        email = OutgoingEmail.objects.get()
+        assert (email.sent, email.attempts) == (None, 1)
+        assert 'SMTP' in email.last_error
+        assert email.send_after > email.created
+
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+        call_command('send_emails')
+        assert mail.outbox == [], 'Письмо отправлено раньше паузы'
+
+        OutgoingEmail.objects.update(send_after=email.created)
+        call_command('send_emails')
+        assert len(mail.outbox) == 1
+
+    def test_connection_failure_backs_off_batch(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_email_outbox.ClosedBackend'
+        self.signup(client)
+        OutgoingEmail.objects.create(
+            subject='Тема', body='Текст', from_email='yamdb@yamdb.com',
+            to='other@yamdb.fake'
+        )
+
+        call_command('send_emails', backoff=60)
+
+        for email in OutgoingEmail.objects.all():
+            assert (email.sent, email.attempts) == (None, 1)
+            assert 'SMTP не отвечает' in email.last_error
+            assert email.send_after > email.created
@@ -0,0 +1,96 @@
+import pytest
+from api.permissions import IsAdminModeratorOwnerOrReadOnly
+from django.core.cache import cache
+from reviews.models import Category, Comment, Genre, Review, Title
+
+
+@pytest.fixture
+def catalog(title, user, another_user):
+    title.genre.add(Genre.objects.create(name='Боевик', slug='action'))
+    Title.objects.create(name='Без категории \u2028', year=2001,
+                         description='')
+    other = Title.objects.create(
+        name='Аватар', year=2009, description='Пандора',
+        category=Category.objects.create(name='Мультфильм', slug='cartoon')
+    )
+    other.genre.add(Genre.objects.create(name='Фантастика', slug='sf'))
+    review = Review.objects.create(title=title, author=user, text='Да',
+                                   score=7)
+    Review.objects.create(title=title, author=another_user, text='Нет',
+                          score=2)
+    for author in (user, another_user):
+        Comment.objects.create(review=review, author=author, text='Ок')
+    return title, review
+
+
+def fetch(client, settings, url, fast, **params):
+    settings.FAST_READ_SERIALIZERS = fast
+    cache.clear()
+    response = client.get(url, params)
+    assert response.status_code == 200, response.content
+    return response.content
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+
+    @pytest.mark.parametrize('params', (
+        {}, {'pagination': 'cursor'}, {'genre': 'drama'},
+    ))
+    def test_lists_are_identical(self, client, settings, catalog, params):
+        title, review = catalog
+        for url in (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title.pk}/reviews/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+        ):
+            assert fetch(client, settings, url, True, **params) == fetch(
+                client, settings, url, False, **params
+            ), url
+
+    @pytest.mark.parametrize('params', ({}, {'expand': 'stats'}))
+    def test_details_are_identical(self, client, settings, catalog, params):
+        title, review = catalog
+        comment = review.comments.first()
+        for url in (
+            f'/api/v1/titles/{title.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/',
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+            f'{comment.pk}/',
+        ):
+            assert fetch(client, settings, url, True, **params) == fetch(
+                client, settings, url, False, **params
+            ), url
+
+    def test_missing_objects(self, client, catalog):
+        title, review = catalog
+        for url in (
+            '/api/v1/titles/0/',
+            '/api/v1/titles/x/',
+            f'/api/v1/titles/{title.pk}/reviews/0/',
+            f'/api/v1/titles/0/reviews/{review.pk}/',
+        ):
+            assert client.get(url).status_code == 404, url
+
+    def test_object_permissions_get_model(self, client, settings, catalog,
+                                          monkeypatch):
+        title, review = catalog
+        seen = []
+
+        def has_object_permission(permission, request, view, obj):
+            seen.append((type(obj), obj.pk, obj.author.username))
+            return True
+
+        monkeypatch.setattr(
+            IsAdminModeratorOwnerOrReadOnly, 'has_object_permission',
+            has_object_permission
+        )
+        fetch(client, settings,
+              f'/api/v1/titles/{title.pk}/reviews/{review.pk}/', True)
+        assert seen == [(Review, review.pk, review.author.username)]
+
+    def test_indent_falls_back(self, client, catalog):
+        response = client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/json; indent=2'
+        )
+        assert response.content.startswith(b'{\n  "count"')
@@ -0,0 +1,223 @@
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Comment, Genre, GenreTitle, Review, Title
+
+CSV_DATA = {
+    'users.csv': (
+        'id,username,email,role,bio,first_name,last_name\n'
+        '100,bingobongo,bingobongo@yamdb.fake,user,,,\n'
+        '101,capt_obvious,capt_obvious@yamdb.fake,admin,,,\n'
+    ),
+    'category.csv': 'id,name,slug\n1,Фильм,movie\n2,Книга,book\n',
+    'genre.csv': 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n',
+    'titles.csv': (
+        'id,name,year,category\n'
+        '1,Побег из Шоушенка,1994,1\n'
+        '2,"Война, и мир",1869,2\n'
+    ),
+    'review.csv': (
+        'id,title_id,text,author,score,pub_date\n'
+        '1,1,"Многострочный\nотзыв",100,10,2019-09-24T21:08:21.567Z\n'
+        '2,1,Отзыв,101,7,2019-09-24T21:08:21.567Z\n'
+    ),
+    'comments.csv': (
+        'id,review_id,text,author,pub_date\n'
+        '1,1,Комментарий,101,2019-09-24T21:08:21.567Z\n'
+    ),
+    'genre_title.csv': 'id,title_id,genre_id\n1,1,1\n2,2,1\n3,2,2\n',
+}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name, content in CSV_DATA.items():
+        (tmp_path / name).write_text(content, encoding='utf8')
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestLoadData:
+
+    @pytest.mark.parametrize('options', (
+        {'batch_size': 1},
+        {'engine': 'copy'},
+    ))
+    def test_load_data(self, data_dir, options):
+        call_command('load_data', path=data_dir, **options)
+
+        assert Title.objects.count() == 2
+        assert Review.objects.get(pk=1).text == 'Многострочный\nотзыв'
+        assert Comment.objects.get(pk=1).author.username == 'capt_obvious'
+        assert GenreTitle.objects.filter(title_id=2).count() == 2
+        title = Title.objects.get(pk=1)
+        assert (title.rating_count, title.rating) == (2, 8), (
+            'Проверьте, что после загрузки пересчитывается рейтинг'
+        )
+        assert Title.objects.create(name='Новое', year=2000).pk == 3, (
+            'Проверьте, что после загрузки сбрасываются счётчики id'
+        )
+
+    def test_resets_response_cache(self, client, data_dir):
+        assert client.get('/api/v1/titles/').json()['count'] == 0
+
+        call_command('load_data', path=data_dir)
+
+        assert client.get('/api/v1/titles/').json()['count'] == 2, (
+            'Проверьте, что загрузка сбрасывает кеш ответов'
+        )
+
+    @pytest.mark.parametrize('engine', ('orm', 'copy'))
+    def test_rebuilds_stats(self, client, data_dir, engine):
+        call_command('load_data', path=data_dir, engine=engine)
+
+        data = client.get('/api/v1/titles/1/stats/').json()
+        assert (data['count'], data['median']) == (2, 8.5), (
+            'Проверьте, что после загрузки пересчитываются гистограммы оценок'
+        )
+        assert (data['histogram']['10'], data['histogram']['7']) == (1, 1)
+
+    @pytest.mark.parametrize('engine', ('orm', 'copy'))
+    def test_keeps_pub_date(self, data_dir, engine):
+        call_command('load_data', path=data_dir, engine=engine)
+
+        assert Review.objects.get(pk=1).pub_date.year == 2019
+        assert Comment.objects.get(pk=1).pub_date.year == 2019
+        review = Review.objects.create(
+            title_id=2, author_id=100, text='Новый', score=5
+        )
+        assert review.pub_date.year > 2019
+
+    def test_keeps_auto_now_add_flag(self, data_dir, monkeypatch):
+        field = Review._meta.get_field('pub_date')
+        flags = []
+        bulk_create = Review.objects.bulk_create
+
+        def record(*args, **kwargs):
+            flags.append(field.auto_now_add)
+            return bulk_create(*args, **kwargs)
+
+        monkeypatch.setattr(Review.objects, 'bulk_create', record)
+        call_command('load_data', path=data_dir)
+
+        assert flags == [True], (
+            'Проверьте, что загрузка не меняет auto_now_add у полей модели'
+        )
+
+    @pytest.mark.parametrize('engine', ('orm', 'copy'))
+    def test_unknown_foreign_key(self, data_dir, engine):
+        (data_dir / 'comments.csv').write_text(
+            'id,review_id,text,author,pub_date\n'
+            '1,42,Комментарий,101,2019-09-24T21:08:21.567Z\n',
+            encoding='utf8'
+        )
+
+        with pytest.raises(CommandError, match='comments.csv'):
+            call_command('load_data', path=data_dir, engine=engine)
+
+    def test_waves_follow_foreign_keys(self):
+        from reviews.management.commands.load_data import get_waves
+
+        waves = [
+            sorted(csv_file for csv_file, _ in wave) for wave in get_waves()
+        ]
+
+        assert waves == [
+            ['category.csv', 'genre.csv', 'users.csv'],
+            ['titles.csv'],
+            ['genre_title.csv', 'review.csv'],
+            ['comments.csv'],
+        ]
+
+    @pytest.mark.parametrize('engine', ('orm', 'copy'))
+    def test_chunks_cover_file(self, data_dir, engine):
+        from reviews.management.commands.load_data import get_ranges, load_file
+
+        options = {'path': data_dir, 'engine': engine, 'batch_size': 10}
+        for csv_file in ('users.csv', 'category.csv', 'titles.csv'):
+            load_file(csv_file, options)
+        ranges = get_ranges(data_dir / 'review.csv', 2)
+
+        rows = [
+            load_file('review.csv', options, byte_range)
+            for byte_range in ranges
+        ]
+
+        assert rows == [1, 1]
+        assert Review.objects.get(pk=1).text == 'Многострочный\nотзыв'
+        assert Review.objects.get(pk=2).text == 'Отзыв'
+
+    def test_ranges_end_on_record_boundaries(self, tmp_path):
+        from reviews.management.commands.load_data import get_ranges
+
+        path = tmp_path / 'review.csv'
+        path.write_bytes(
+            b'id,text\n1,"a\nb ""c""\nd"\n2,e\n3,"f\n\ng"\n4,h\n'
+        )
+
+        for chunks in range(1, 8):
+            ranges = get_ranges(path, chunks)
+            data = path.read_bytes()
+            assert ranges[0][0] == data.index(b'\n') + 1
+            assert ranges[-1][1] == len(data)
+            assert all(
+                end == start for (_, end), (start, _) in zip(ranges, ranges[1:])
+            )
+            for start, end in ranges:
+                assert data[start:end].count(b'"') % 2 == 0
+
+    def test_serial_load_is_atomic(self, data_dir):
+        (data_dir / 'comments.csv').write_text(
+            'id,review_id,text,author,pub_date\n'
+            '1,42,Комментарий,101,2019-09-24T21:08:21.567Z\n',
+            encoding='utf8'
+        )
+
+        with pytest.raises(CommandError):
+            call_command('load_data', path=data_dir)
+
+        assert not Title.objects.exists()
+
+    def test_delete_loaded(self, data_dir):
+        from reviews.management.commands.load_data import (delete_loaded,
+                                                           get_ranges,
+                                                           load_file)
+
+        options = {'path': data_dir, 'engine': 'orm', 'batch_size': 10}
+        Genre.objects.create(id=10, name='Ужасы', slug='horror')
+        loaded = []
+        for csv_file in ('category.csv', 'genre.csv', 'titles.csv'):
+            for byte_range in get_ranges(data_dir / csv_file, 2):
+                load_file(csv_file, options, byte_range)
+                loaded.append((csv_file, byte_range))
+
+        delete_loaded(loaded, options)
+
+        assert not Title.objects.exists()
+        assert list(Genre.objects.values_list('slug', flat=True)) == [
+            'horror'
+        ]
+
+    def test_parallel_requires_pk_column(self, data_dir):
+        from reviews.management.commands.load_data import check_pk_columns
+
+        (data_dir / 'genre_title.csv').write_text(
+            'title_id,genre_id\n1,1\n', encoding='utf8'
+        )
+
+        with pytest.raises(CommandError, match='genre_title.csv'):
+            check_pk_columns({'path': data_dir})
+
+    def test_cleanup_keeps_load_error(self, monkeypatch):
+        from reviews.management.commands import load_data
+
+        def fail(loaded, options):
+            raise ValueError('no id column')
+
+        monkeypatch.setattr(load_data, 'delete_loaded', fail)
+
+        with pytest.raises(CommandError) as info:
+            load_data.Command().delete_loaded(
+                CommandError('titles.csv: bad year'), [], {}
+            )
+        assert 'bad year' in str(info.value)
+        assert 'no id column' in str(info.value)
@@ -0,0 +1,56 @@
+import re
+
+import pytest
+from api.middleware import metrics
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_server_timing_header(self, client, title):
+        response = client.get(f'/api/v1/titles/{title.pk}/')
+        timing = response['Server-Timing']
+        assert re.match(
+            r'db;dur=[\d.]+;desc="\d+ queries", '
+            r'serialize;dur=[\d.]+, total;dur=[\d.]+$', timing
+        )
+        assert 'desc="0 queries"' not in timing
+
+    def test_metrics_aggregate_routes(self, client, title):
+        client.get(f'/api/v1/titles/{title.pk}/')
+        client.get('/api/v1/titles/')
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        labels = 'method="GET",route="titles-detail"'
+        assert f'yamdb_request_duration_seconds_bucket{{{labels},le="+Inf"}}' in text
+        assert f'yamdb_db_queries_total{{{labels}}}' in text
+        assert 'route="titles-list"' in text
+        assert 'yamdb_response_cache_total{group="titles"' in text
+
+    def test_streamed_queries_are_counted(self, client, settings, category):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000, category=category)
+            for number in range(6)
+        )
+        settings.STREAM_CHUNK_SIZE = 2
+        key = ('GET', 'titles-list')
+        before = metrics[key].queries if key in metrics else 0
+        response = client.get('/api/v1/titles/', {'page_size': 6})
+        assert response.streaming
+        assert key not in metrics or metrics[key].queries == before, (
+            'Проверьте, что потоковый ответ учитывается после отдачи'
+        )
+        streamed = b''.join(response.streaming_content)
+        response.close()
+        header = int(re.search(r'"(\d+) queries"', response['Server-Timing'])[1])
+        assert streamed.endswith(b']}')
+        assert metrics[key].queries - before > header
+
+    def test_metrics_token(self, client, settings):
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics').status_code == 403
+        response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        assert response.status_code == 200
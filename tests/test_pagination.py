@@ -0,0 +1,210 @@
+import json
+
+import pytest
+from api import counts
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Genre, Review, Title
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    @pytest.fixture
+    def titles(self, category):
+        return Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000, category=category)
+            for number in range(7)
+        )
+
+    def test_page_number_by_default(self, client, titles):
+        response = client.get('/api/v1/titles/')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 7
+        assert len(data['results']) == 5
+
+    @pytest.mark.parametrize('params, headers', (
+        ({'pagination': 'cursor'}, {}),
+        ({}, {'HTTP_ACCEPT': 'application/json; pagination=cursor'}),
+    ))
+    def test_cursor_mode(self, client, titles, params, headers):
+        response = client.get('/api/v1/titles/', params, **headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data
+        first_page = [title['id'] for title in data['results']]
+        assert first_page == sorted(first_page, reverse=True)
+        assert len(first_page) == 5
+
+        response = client.get(data['next'], **headers)
+
+        rest = [title['id'] for title in response.json()['results']]
+        assert len(rest) == 2
+        assert max(rest) < min(first_page)
+
+
+def content(response):
+    if response.streaming:
+        return b''.join(response.streaming_content)
+    return response.content
+
+
+@pytest.mark.django_db
+class TestPageSizePagination:
+
+    @pytest.fixture
+    def genres(self):
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {number}', slug=f'genre-{number}')
+            for number in range(7)
+        )
+        return list(Genre.objects.all())
+
+    @pytest.fixture
+    def titles(self, category, genres):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {number}', year=2000, category=category)
+            for number in range(7)
+        )
+        for title in Title.objects.all():
+            title.genre.set(genres[:2])
+
+    def test_page_size_is_capped(self, client, settings, titles):
+        settings.MAX_PAGE_SIZE = 6
+        data = client.get('/api/v1/titles/', {'page_size': 3}).json()
+        assert len(data['results']) == 3
+        data = client.get('/api/v1/titles/', {'page_size': 100}).json()
+        assert len(data['results']) == 6
+
+    def test_without_count(self, client, titles):
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/', {'count': 'false'})
+        data = response.json()
+        assert list(data) == ['next', 'previous', 'results']
+        assert len(data['results']) == 5
+        assert data['next']
+        assert not any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        )
+        data = client.get(data['next']).json()
+        assert len(data['results']) == 2
+        assert data['next'] is None
+        assert client.get(
+            '/api/v1/titles/', {'count': 'false', 'page': 3}
+        ).status_code == 404
+
+    def test_cursor_page_size(self, client, titles):
+        data = client.get(
+            '/api/v1/titles/', {'pagination': 'cursor', 'page_size': 7}
+        ).json()
+        assert len(data['results']) == 7
+
+    @pytest.mark.parametrize('url', ('/api/v1/titles/', '/api/v1/genres/'))
+    @pytest.mark.parametrize('params', (
+        {'page_size': 7}, {'page_size': 6, 'count': 'false'},
+        {'page_size': 3, 'page': 3},
+    ))
+    def test_streamed_pages_are_identical(self, client, settings, titles,
+                                          url, params):
+        settings.STREAM_CHUNK_SIZE = 1000
+        expected = client.get(url, params)
+        assert not expected.streaming
+        settings.STREAM_CHUNK_SIZE = 2
+        cache.clear()
+        response = client.get(url, params)
+        assert response.streaming
+        assert response.status_code == 200
+        assert content(response) == expected.content
+
+    def test_streamed_page_reads_once(self, client, settings, titles):
+        settings.STREAM_CHUNK_SIZE = 2
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/v1/titles/', {'page_size': 7})
+            data = json.loads(content(response))
+        assert len(data['results']) == 7
+        assert all(len(title['genre']) == 2 for title in data['results'])
+        selects = [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "reviews_title"' in query['sql']
+            and 'COUNT(' not in query['sql']
+        ]
+        assert len(selects) == 1, (
+            'Проверьте, что потоковая страница читается одним запросом'
+        )
+        assert 'OFFSET' not in selects[0]
+
+    @pytest.mark.parametrize('params', (
+        {'page_size': 3, 'page': 4},
+        {'page_size': 3, 'page': 4, 'count': 'false'},
+    ))
+    def test_streamed_page_past_end(self, client, settings, titles, params):
+        settings.STREAM_CHUNK_SIZE = 2
+        assert client.get('/api/v1/titles/', params).status_code == 404
+
+    def test_users_stream(self, admin_client, settings, user, another_user):
+        settings.STREAM_CHUNK_SIZE = 1
+        response = admin_client.get('/api/v1/users/', {'page_size': 10})
+        assert response.streaming
+        assert len(json.loads(content(response))['results']) == 3
+
+    def test_browsable_api_is_not_streamed(self, client, settings, titles):
+        settings.STREAM_CHUNK_SIZE = 2
+        response = client.get(
+            '/api/v1/titles/', {'page_size': 7}, HTTP_ACCEPT='text/html'
+        )
+        assert not response.streaming
+
+
+@pytest.mark.django_db
+class TestCountModes:
+
+    def test_review_count_reuses_etag_count(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Да', score=5)
+        url = f'/api/v1/titles/{title.pk}/reviews/'
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).json()['count'] == 1
+        assert sum(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ) == 1, 'Проверьте, что count берётся из запроса для ETag'
+
+    def test_title_estimate(self, client, settings, monkeypatch, title):
+        assert counts.estimate_count(Title.objects.all()) is None
+        monkeypatch.setattr(counts, 'estimate_count', lambda queryset: 900)
+        settings.COUNT_ESTIMATE_MIN = 1000
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+        settings.COUNT_ESTIMATE_MIN = 100
+        cache.clear()
+        assert client.get('/api/v1/titles/').json()['count'] == 900
+
+    def test_filtered_count_is_cached(self, client, title):
+        params = {'year': title.year}
+        assert client.get('/api/v1/titles/', params).json()['count'] == 1
+        Title.objects.create(name='Ещё', year=title.year)
+        with CaptureQueriesContext(connection) as queries:
+            data = client.get(
+                '/api/v1/titles/', {**params, 'page_size': 1}
+            ).json()
+        assert not any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ), 'Проверьте, что count кешируется на COUNT_CACHE_TIMEOUT'
+        assert data['count'] == 1
+        assert data['next'] is not None, (
+            'Проверьте, что следующая страница ищется по лишней строке'
+        )
+        cache.clear()
+        assert client.get('/api/v1/titles/', params).json()['count'] == 2
+
+    def test_non_filter_params(self, client, monkeypatch, settings, title):
+        monkeypatch.setattr(counts, 'estimate_count', lambda queryset: 900)
+        settings.COUNT_ESTIMATE_MIN = 100
+        for params in ({'expand': 'stats'}, {'year': ''}):
+            assert client.get(
+                '/api/v1/titles/', params
+            ).json()['count'] == 900, (
+                'Проверьте, что фильтром считаются только параметры '
+                'filter_backends'
+            )
@@ -0,0 +1,86 @@
+import pytest
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db
+class TestQueryCounts:
+
+    def test_title_list(self, client, assert_queries_do_not_grow):
+        def add_titles(count):
+            for _ in range(count):
+                number = Title.objects.count()
+                category = Category.objects.create(
+                    name=f'Категория {number}', slug=f'category-{number}'
+                )
+                title = Title.objects.create(
+                    name=f'Произведение {number}', year=2000,
+                    category=category
+                )
+                title.genre.add(
+                    Genre.objects.create(
+                        name=f'Жанр {number}', slug=f'genre-{number}'
+                    )
+                )
+
+        assert_queries_do_not_grow(client, '/api/v1/titles/', add_titles)
+
+    def test_title_detail(self, client, title, django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+
+    def test_review_list(self, client, title, django_user_model,
+                         assert_queries_do_not_grow):
+        from reviews.models import Review
+
+        def add_reviews(count):
+            for _ in range(count):
+                number = Review.objects.count()
+                author = django_user_model.objects.create_user(
+                    username=f'reviewer{number}',
+                    email=f'reviewer{number}@yamdb.fake'
+                )
+                Review.objects.create(
+                    title=title, author=author, text='Да', score=5
+                )
+
+        queries = assert_queries_do_not_grow(
+            client, f'/api/v1/titles/{title.pk}/reviews/', add_reviews
+        )
+        assert queries <= 3
+
+    def test_comment_list(self, client, title, user, django_user_model,
+                          assert_queries_do_not_grow):
+        from reviews.models import Comment, Review
+        review = Review.objects.create(
+            title=title, author=user, text='Да', score=5
+        )
+
+        def add_comments(count):
+            for _ in range(count):
+                number = Comment.objects.count()
+                author = django_user_model.objects.create_user(
+                    username=f'commenter{number}',
+                    email=f'commenter{number}@yamdb.fake'
+                )
+                Comment.objects.create(review=review, author=author, text='Да')
+
+        queries = assert_queries_do_not_grow(
+            client,
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/',
+            add_comments
+        )
+        assert queries <= 3
+
+    def test_missing_parents(self, client, title, user):
+        from reviews.models import Review
+        review = Review.objects.create(
+            title=title, author=user, text='Да', score=5
+        )
+        assert client.get(
+            f'/api/v1/titles/{title.pk}/reviews/{review.pk}/comments/'
+        ).status_code == 200
+        assert client.get('/api/v1/titles/0/reviews/').status_code == 404
+        assert client.get(
+            f'/api/v1/titles/0/reviews/{review.pk}/comments/'
+        ).status_code == 404
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from reviews.models import Review, Title, TitleRanking
+
+
+@pytest.fixture
+def ranked_titles(title, genre, user, another_user):
+    other = Title.objects.create(name='Аватар', year=2009)
+    Review.objects.create(title=title, author=user, text='Да', score=6)
+    Review.objects.create(title=other, author=user, text='Да', score=9)
+    Review.objects.create(title=other, author=another_user, text='Да', score=9)
+    call_command('refresh_rankings', '--size', '5')
+    return title, other
+
+
+@pytest.mark.django_db
+class TestRankings:
+
+    def test_top(self, client, ranked_titles):
+        title, other = ranked_titles
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        assert [row['id'] for row in response.json()] == [other.pk, title.pk]
+        assert response.json()[0]['rating'] == 9
+
+    def test_top_in_genre(self, client, ranked_titles):
+        title, _ = ranked_titles
+        response = client.get('/api/v1/titles/top/?genre=drama')
+        assert [row['id'] for row in response.json()] == [title.pk]
+        response = client.get('/api/v1/titles/top/?category=films')
+        assert [row['id'] for row in response.json()] == [title.pk]
+
+    def test_trending_uses_recent_reviews(self, client, ranked_titles):
+        title, other = ranked_titles
+        Review.objects.filter(title=other).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        call_command('refresh_rankings', '--days', '7')
+        response = client.get('/api/v1/titles/trending/')
+        assert [row['id'] for row in response.json()] == [title.pk]
+
+    def test_size_limit(self, ranked_titles):
+        call_command('refresh_rankings', '--size', '1')
+        assert TitleRanking.objects.filter(
+            kind=TitleRanking.TOP, genre=None, category=None
+        ).count() == 1
+
+    def test_constant_queries(self, client, ranked_titles,
+                              django_assert_max_num_queries):
+        with django_assert_max_num_queries(2):
+            client.get('/api/v1/titles/top/')
+
+    def test_genre_and_category_conflict(self, client, ranked_titles):
+        response = client.get('/api/v1/titles/top/?genre=drama&category=films')
+        assert response.status_code == 400
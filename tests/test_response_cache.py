@@ -0,0 +1,60 @@
+import pytest
+from reviews.models import Genre, Review
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_titles_are_cached(self, client, title,
+                               django_assert_num_queries):
+        url = f'/api/v1/titles/{title.pk}/'
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+
+        with django_assert_num_queries(0):
+            response = client.get(url)
+
+        assert response['X-Cache'] == 'HIT'
+        assert response.json()['name'] == title.name
+
+    def test_review_invalidates_titles(self, client, title, user):
+        client.get('/api/v1/titles/')
+
+        Review.objects.create(title=title, author=user, text='Текст', score=4)
+        response = client.get('/api/v1/titles/')
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['results'][0]['rating'] == 4
+
+    def test_genre_change_invalidates_titles(self, client, title):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/titles/')
+
+        title.genre.add(Genre.objects.create(name='Комедия', slug='comedy'))
+
+        assert client.get('/api/v1/genres/')['X-Cache'] == 'MISS'
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        assert len(response.json()['results'][0]['genre']) == 2
+
+    def test_key_depends_on_query(self, client, title):
+        client.get('/api/v1/titles/')
+
+        response = client.get('/api/v1/titles/', {'name': 'нет такого'})
+
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 0
+
+    def test_stats(self, admin_client, client):
+        client.get('/api/v1/categories/')
+        client.get('/api/v1/categories/')
+
+        response = admin_client.get('/api/v1/cache/stats/')
+
+        assert response.status_code == 200
+        stats = {
+            (row['group'], row['outcome']): row['count']
+            for row in response.json()
+        }
+        assert stats[('categories', 'hit')] >= 1
+        assert stats[('categories', 'miss')] >= 1
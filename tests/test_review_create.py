@@ -0,0 +1,64 @@
+import pytest
+from api.authentication import ClaimsAccessToken
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from reviews.models import Review, TitleScore
+
+
+@pytest.mark.django_db
+class TestReviewCreate:
+
+    def url(self, title_id):
+        return f'/api/v1/titles/{title_id}/reviews/'
+
+    def test_create_updates_rating(self, user_client, title):
+        response = user_client.post(
+            self.url(title.pk), {'text': 'Хорошо', 'score': 7}
+        )
+        assert response.status_code == 201, response.json()
+        assert response.json()['title'] == title.pk
+        assert response.json()['author'] == 'TestUser'
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating) == (1, 7)
+
+    def test_duplicate(self, user_client, title, user):
+        Review.objects.create(title=title, author=user, text='Да', score=5)
+        response = user_client.post(
+            self.url(title.pk), {'text': 'Ещё', 'score': 9}
+        )
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': [
+            'Нельзя оставить два отзыва на одно произведение.'
+        ]}
+        title.refresh_from_db()
+        assert (title.rating_count, title.rating) == (1, 5)
+        assert TitleScore.objects.get(title=title, score=5).count == 1
+        assert not TitleScore.objects.filter(title=title, score=9).exists()
+
+    def test_missing_title(self, user_client):
+        response = user_client.post(self.url(0), {'text': 'Да', 'score': 5})
+        assert response.status_code == 404
+        assert not Review.objects.exists()
+
+    def test_receiver_skips_missing_title(self, user):
+        review = Review(title_id=0, author=user, text='Да', score=5)
+        with transaction.atomic():
+            review.save()
+            assert not review.is_rated
+            transaction.set_rollback(True)
+
+    def test_no_read_queries(self, client, user, title):
+        TitleScore.objects.create(title=title, score=7, count=0)
+        token = ClaimsAccessToken.for_user(user)
+        with CaptureQueriesContext(connection) as queries:
+            client.post(
+                self.url(title.pk), {'text': 'Да', 'score': 7},
+                HTTP_AUTHORIZATION=f'Bearer {token}'
+            )
+        statements = [
+            query['sql'].split()[0] for query in queries.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+        # SELECT сверяет claims_version токена, username автора
+        # для ответа берётся из токена.
+        assert statements == ['SELECT', 'INSERT', 'UPDATE', 'UPDATE']
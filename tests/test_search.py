@@ -0,0 +1,47 @@
+import pytest
+from reviews.models import Title
+
+
+@pytest.mark.django_db
+class TestTitleSearch:
+
+    @pytest.fixture
+    def titles(self, category):
+        return [
+            Title.objects.create(
+                name=name, year=2000, description=description,
+                category=category
+            )
+            for name, description in (
+                ('Мастер и Маргарита', 'Роман о дьяволе'),
+                ('Роман', 'Поэма'),
+                ('Война и мир', 'Роман-эпопея'),
+                ('Москва — Петушки', 'Поэма'),
+            )
+        ]
+
+    def test_search_is_ranked(self, client, titles):
+        response = client.get('/api/v1/titles/', {'search': 'роман'})
+
+        assert response.status_code == 200
+        names = [title['name'] for title in response.json()['results']]
+        assert names[0] == 'Роман'
+        assert sorted(names[1:]) == ['Война и мир', 'Мастер и Маргарита']
+
+    def test_search_with_pagination(self, client, titles, category):
+        Title.objects.bulk_create(
+            Title(name=f'Роман {number}', year=2000, category=category)
+            for number in range(6)
+        )
+
+        response = client.get('/api/v1/titles/', {'search': 'роман'})
+
+        data = response.json()
+        assert data['count'] == 9
+        assert len(data['results']) == 5
+        assert data['next']
+
+    def test_search_without_matches(self, client, titles):
+        response = client.get('/api/v1/titles/', {'search': 'xyz'})
+
+        assert response.json()['count'] == 0
@@ -0,0 +1,50 @@
+import pytest
+from reviews.models import Category, Genre, Title
+
+
+@pytest.mark.django_db
+class TestExactTitleFilter:
+
+    @pytest.fixture
+    def titles(self, category, genre):
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        book = Category.objects.create(name='Книга', slug='book')
+        titles = []
+        for name, year, title_category, genres in (
+            ('Титаник', 1997, category, (genre,)),
+            ('Маска', 1994, category, (genre, comedy)),
+            ('Мёртвые души', 1842, book, (comedy,)),
+        ):
+            title = Title.objects.create(
+                name=name, year=year, category=title_category
+            )
+            title.genre.set(genres)
+            titles.append(title)
+        return titles
+
+    def names(self, client, **params):
+        response = client.get('/api/v1/titles/', {'match': 'exact', **params})
+        assert response.status_code == 200
+        return sorted(title['name'] for title in response.json()['results'])
+
+    def test_genre(self, client, titles):
+        assert self.names(client, genre='drama') == ['Маска', 'Титаник']
+        assert self.names(client, genre='dram') == []
+        assert self.names(client, genre='drama,comedy') == [
+            'Маска', 'Мёртвые души', 'Титаник'
+        ]
+
+    def test_category(self, client, titles):
+        assert self.names(client, category='book') == ['Мёртвые души']
+        assert self.names(client, category='boo') == []
+
+    def test_year(self, client, titles):
+        assert self.names(client, year=1997) == ['Титаник']
+        assert self.names(client, year__gte=1900, year__lte=1995) == [
+            'Маска'
+        ]
+
+    def test_contains_mode_is_default(self, client, titles):
+        response = client.get('/api/v1/titles/', {'genre': 'dram'})
+
+        assert response.json()['count'] == 2
@@ -0,0 +1,79 @@
+import pytest
+from django.core.management import call_command
+from reviews.models import Review, Title
+
+
+def refreshed(title):
+    return Title.objects.get(pk=title.pk)
+
+
+@pytest.mark.django_db
+class TestTitleRating:
+
+    def test_rating_follows_review_writes(self, title, user, another_user):
+        assert refreshed(title).rating is None
+
+        review = Review.objects.create(
+            title=title, author=user, text='Текст', score=10
+        )
+        Review.objects.create(
+            title=title, author=another_user, text='Текст', score=5
+        )
+        title = refreshed(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            15, 2, 7
+        ), 'Проверьте, что рейтинг пересчитывается при создании отзыва'
+
+        review = Review.objects.get(pk=review.pk)
+        review.score = 1
+        review.save()
+        title = refreshed(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            6, 2, 3
+        ), 'Проверьте, что рейтинг пересчитывается при изменении отзыва'
+
+        review.delete()
+        title = refreshed(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            5, 1, 5
+        ), 'Проверьте, что рейтинг пересчитывается при удалении отзыва'
+
+        another_user.delete()
+        title = refreshed(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            0, 0, None
+        )
+
+    def test_rebuild_ratings_command(self, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=8)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+
+        call_command('rebuild_ratings')
+
+        title = refreshed(title)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            8, 1, 8
+        )
+
+    def test_rebuild_ratings_resets_cache(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=8)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'rating'
+        ] is None
+
+        call_command('rebuild_ratings')
+
+        assert client.get('/api/v1/titles/').json()['results'][0][
+            'rating'
+        ] == 8, 'Проверьте, что пересчёт рейтинга сбрасывает кеш ответов'
+
+    def test_title_list_shows_rating(self, client, title, user):
+        Review.objects.create(title=title, author=user, text='Текст', score=9)
+
+        response = client.get('/api/v1/titles/')
+
+        assert response.status_code == 200
+        result = response.json()['results'][0]
+        assert result['rating'] == 9
+        assert 'rating_sum' not in result
@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import CommandError, call_command
+from reviews.models import Review, TitleScore
+
+
+@pytest.fixture
+def scored_title(title, user, another_user, admin):
+    for author, score in ((user, 3), (another_user, 8), (admin, 8)):
+        Review.objects.create(title=title, author=author, text='Да',
+                              score=score)
+    return title
+
+
+@pytest.mark.django_db
+class TestTitleStats:
+
+    def test_stats(self, client, scored_title):
+        response = client.get(f'/api/v1/titles/{scored_title.pk}/stats/')
+        assert response.status_code == 200
+        data = response.json()
+        assert data['count'] == 3
+        assert data['mean'] == 6.33
+        assert data['median'] == 8
+        assert data['histogram']['8'] == 2
+        assert data['histogram']['3'] == 1
+        assert sum(data['histogram'].values()) == 3
+
+    def test_even_median_and_updates(self, client, scored_title, user):
+        review = Review.objects.get(author=user)
+        review.score = 5
+        review.save()
+        Review.objects.filter(score=8).first().delete()
+        data = client.get(f'/api/v1/titles/{scored_title.pk}/stats/').json()
+        assert data['count'] == 2
+        assert data['median'] == 6.5
+        assert data['histogram']['3'] == 0
+
+    def test_empty_and_missing(self, client, title):
+        data = client.get(f'/api/v1/titles/{title.pk}/stats/').json()
+        assert data['count'] == 0
+        assert data['median'] is None
+        assert client.get('/api/v1/titles/0/stats/').status_code == 404
+        assert client.get('/api/v1/titles/x/stats/').status_code == 404
+
+    def test_expand(self, client, scored_title):
+        url = f'/api/v1/titles/{scored_title.pk}/'
+        assert 'stats' not in client.get(url).json()
+        data = client.get(url, {'expand': 'stats'}).json()
+        assert data['stats']['count'] == 3
+
+    def test_check_and_rebuild(self, scored_title):
+        call_command('rebuild_ratings', '--check')
+        TitleScore.objects.filter(score=8).update(count=5)
+        with pytest.raises(CommandError, match=str(scored_title.pk)):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings')
+        call_command('rebuild_ratings', '--check')